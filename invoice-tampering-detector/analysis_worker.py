@@ -0,0 +1,47 @@
+"""Worker-process side of the Flask app's invoice analysis pool.
+
+Spawned workers import this module instead of ``app``, so they never build a Flask
+app or a pool of their own; the detectors are only loaded inside the workers.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from detector.fraud_scorer import InvoiceFraudScorer
+
+
+_worker_fraud_scorer: InvoiceFraudScorer | None = None
+
+
+def init_analysis_worker(results_directory: str, public_results_prefix: str) -> None:
+    """Pool initializer: build this worker's scorer (scorers hold locks and thread pools, so they don't pickle)."""
+
+    # Tesseract's OpenMP threads oversubscribe the CPU once pages are OCR'd in parallel workers;
+    # one thread per page gives better throughput. Set before the detector import below loads
+    # libtesseract (tesserocr); pytesseract subprocesses inherit it.
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+    # Imported here so the web process never loads the detectors (Numba, OCR) it doesn't run.
+    from detector.fraud_scorer import InvoiceFraudScorer
+
+    global _worker_fraud_scorer
+    _worker_fraud_scorer = InvoiceFraudScorer(
+        results_directory=results_directory,
+        public_results_prefix=public_results_prefix,
+        max_image_width_px=2000,
+        pdf_dpi=200,
+        defer_visualization_save=True,
+    )
+
+
+def analyze_in_worker(invoice_source: str | bytes) -> dict[str, Any]:
+    """Process-pool entry point: analyze a saved PDF path or in-memory image bytes."""
+
+    assert _worker_fraud_scorer is not None, "init_analysis_worker() must run first"
+    if isinstance(invoice_source, bytes):
+        return _worker_fraud_scorer.analyze_invoice_stream(io.BytesIO(invoice_source))
+    return _worker_fraud_scorer.analyze_invoice_file(invoice_source)
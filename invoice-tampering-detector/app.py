@@ -7,17 +7,24 @@ Endpoints:
 
 from __future__ import annotations
 
+import multiprocessing
 import os
+import shutil
+import threading
+import time
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import Any
 
-from flask import Flask, jsonify, render_template, request
+from flask import Flask, jsonify, render_template, request, send_from_directory
 from flask_cors import CORS
-from pdf2image import convert_from_path
 from PIL import UnidentifiedImageError
 from werkzeug.utils import secure_filename
 
-from detector.fraud_scorer import InvoiceFraudScorer
+from analysis_worker import analyze_in_worker, init_analysis_worker
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -26,6 +33,9 @@ RESULTS_FOLDER = PROJECT_ROOT / "static" / "results"
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".pdf"}
 MAX_UPLOAD_BYTES = 16 * 1024 * 1024
+RESULT_FILE_WAIT_SECONDS = 3.0
+MAX_PENDING_RESULT_FILES = 256
+UPLOAD_COPY_CHUNK_BYTES = 1024 * 1024
 
 
 def _ensure_runtime_directories() -> None:
@@ -41,6 +51,84 @@ def _is_allowed_filename(uploaded_filename: str) -> bool:
     return Path(uploaded_filename).suffix.lower() in ALLOWED_EXTENSIONS
 
 
+def _new_analysis_executor() -> ProcessPoolExecutor:
+    """Create the analysis worker pool; each worker builds its own scorer in init_analysis_worker.
+
+    "spawn" avoids forking a parent whose detector thread pools can't survive fork().
+    """
+
+    return ProcessPoolExecutor(
+        max_workers=max(2, (os.cpu_count() or 2) // 2),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_analysis_worker,
+        initargs=(str(RESULTS_FOLDER), "/static/results"),
+    )
+
+
+def _get_analysis_executor() -> ProcessPoolExecutor:
+    """Return the analysis pool, creating it on first use.
+
+    Created lazily rather than at import: spawned workers re-import the main script
+    (``python app.py``), and must not each start an idle pool of their own.
+    """
+
+    global ANALYSIS_EXECUTOR
+
+    with ANALYSIS_EXECUTOR_LOCK:
+        if ANALYSIS_EXECUTOR is None:
+            ANALYSIS_EXECUTOR = _new_analysis_executor()
+        return ANALYSIS_EXECUTOR
+
+
+def _run_analysis(invoice_source: str | bytes) -> dict[str, Any]:
+    """Analyze in the worker pool, discarding the pool if a worker died (the error still propagates)."""
+
+    global ANALYSIS_EXECUTOR
+
+    analysis_executor = _get_analysis_executor()
+    try:
+        return analysis_executor.submit(analyze_in_worker, invoice_source).result()
+    except BrokenProcessPool:
+        # A crashed worker (OOM, native fault) breaks the pool for good; drop it once, even if
+        # several in-flight requests see the failure together, and the next request starts a fresh one.
+        with ANALYSIS_EXECUTOR_LOCK:
+            if ANALYSIS_EXECUTOR is analysis_executor:
+                ANALYSIS_EXECUTOR = None
+                analysis_executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def _remember_pending_result_file(analysis_result: dict[str, Any]) -> None:
+    """Record the ELA visualization name a worker may still be saving for this response."""
+
+    visualization_path = (analysis_result.get("ela") or {}).get("visualization_path")
+    if not visualization_path:
+        return
+
+    with PENDING_RESULT_FILES_LOCK:
+        PENDING_RESULT_FILES[os.path.basename(visualization_path)] = None
+        while len(PENDING_RESULT_FILES) > MAX_PENDING_RESULT_FILES:
+            PENDING_RESULT_FILES.popitem(last=False)
+
+
+def _claim_pending_result_file(filename: str) -> bool:
+    """Return True (once) if filename was handed out by this process and may still be in flight."""
+
+    with PENDING_RESULT_FILES_LOCK:
+        if filename not in PENDING_RESULT_FILES:
+            return False
+        del PENDING_RESULT_FILES[filename]
+        return True
+
+
+def _wait_for_result_file(result_path: Path, *, timeout_s: float) -> None:
+    """Poll until a worker process has published result_path (or the timeout expires)."""
+
+    deadline = time.monotonic() + timeout_s
+    while not result_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+
 def _save_uploaded_file(uploaded_file) -> Path:
     """Persist an uploaded file to uploads/ with a collision-resistant name."""
 
@@ -52,25 +140,15 @@ def _save_uploaded_file(uploaded_file) -> Path:
     destination_path = UPLOAD_FOLDER / f"{unique_prefix}_{safe_name}"
 
     try:
-        uploaded_file.save(destination_path)
+        # 1 MiB chunks/buffer: a 16 MB upload takes ~16 write() calls instead of ~1000.
+        with open(destination_path, "wb", buffering=UPLOAD_COPY_CHUNK_BYTES) as destination_file:
+            shutil.copyfileobj(uploaded_file.stream, destination_file, length=UPLOAD_COPY_CHUNK_BYTES)
     except OSError as save_error:
         raise OSError(f"Failed to save upload: {save_error}") from save_error
 
     return destination_path
 
 
-def _convert_pdf_first_page(pdf_path: Path, *, dpi: int = 200):
-    """Convert the first page of a PDF into a Pillow RGB image."""
-
-    try:
-        rendered_pages = convert_from_path(str(pdf_path), dpi=dpi, first_page=1, last_page=1)
-        if not rendered_pages:
-            raise ValueError("PDF conversion returned no pages.")
-        return rendered_pages[0].convert("RGB")
-    except Exception as pdf_error:
-        raise ValueError(f"PDF conversion failed: {pdf_error}") from pdf_error
-
-
 _ensure_runtime_directories()
 
 app = Flask(__name__, static_folder="static", template_folder="templates")
@@ -79,12 +157,14 @@ app.config["UPLOAD_FOLDER"] = str(UPLOAD_FOLDER)
 
 CORS(app, resources={r"/api/*": {"origins": "*"}})
 
-fraud_scorer = InvoiceFraudScorer(
-    results_directory=str(RESULTS_FOLDER),
-    public_results_prefix="/static/results",
-    max_image_width_px=2000,
-    pdf_dpi=200,
-)
+# Analysis runs in worker processes so concurrent uploads use more than one core.
+ANALYSIS_EXECUTOR: ProcessPoolExecutor | None = None
+ANALYSIS_EXECUTOR_LOCK = threading.Lock()
+
+# Visualization names returned to clients whose deferred PNG save may not have landed yet.
+# Only these are worth waiting for; any other missing file is an immediate 404.
+PENDING_RESULT_FILES: OrderedDict[str, None] = OrderedDict()
+PENDING_RESULT_FILES_LOCK = threading.Lock()
 
 
 @app.get("/")
@@ -94,6 +174,15 @@ def index():
     return render_template("index.html")
 
 
+@app.get("/static/results/<path:filename>")
+def ela_visualization(filename: str):
+    """Serve an ELA visualization, waiting briefly if a worker is still saving it."""
+
+    if _claim_pending_result_file(filename):
+        _wait_for_result_file(RESULTS_FOLDER / filename, timeout_s=RESULT_FILE_WAIT_SECONDS)
+    return send_from_directory(RESULTS_FOLDER, filename)
+
+
 @app.post("/api/analyze")
 def analyze_invoice():
     """Analyze an uploaded invoice and return a JSON fraud assessment."""
@@ -107,16 +196,21 @@ def analyze_invoice():
 
     saved_path: Path | None = None
     try:
-        saved_path = _save_uploaded_file(uploaded_file)
-        extension = saved_path.suffix.lower()
-
-        if extension == ".pdf":
-            invoice_image = _convert_pdf_first_page(saved_path, dpi=200)
-            analysis_result = fraud_scorer.analyze_invoice_image(invoice_image, is_pdf=True)
+        if Path(uploaded_file.filename or "").suffix.lower() == ".pdf":
+            # pdf2image shells out to pdftoppm, which needs a real file path.
+            saved_path = _save_uploaded_file(uploaded_file)
+            invoice_source: str | bytes = str(saved_path)
         else:
-            analysis_result = fraud_scorer.analyze_invoice_file(str(saved_path))
+            # Images are decoded straight from memory; MAX_CONTENT_LENGTH bounds the buffer.
+            invoice_source = uploaded_file.read()
+
+        analysis_result = _run_analysis(invoice_source)
+        _remember_pending_result_file(analysis_result)
 
         return jsonify(analysis_result)
+    except BrokenProcessPool as pool_error:
+        app.logger.exception("Invoice analysis worker crashed: %s", pool_error)
+        return jsonify({"error": "Analysis worker crashed; please retry."}), 503
     except (ValueError, UnidentifiedImageError) as client_error:
         app.logger.exception("Invoice analysis rejected: %s", client_error)
         return jsonify({"error": str(client_error)}), 400
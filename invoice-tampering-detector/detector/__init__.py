@@ -2,12 +2,28 @@
 
 This package bundles ELA image forensics, EXIF inspection, and OCR math checks
 for spotting common invoice tampering patterns.
+
+Detector classes are resolved lazily (PEP 562) so importing the package does not
+pull in OpenCV/Tesseract/NumPy until a detector is actually used.
 """
 
-from .ela_detector import InvoiceElaAnalyzer
-from .fraud_scorer import InvoiceFraudScorer
-from .metadata_checker import InvoiceMetadataInspector
-from .ocr_validator import InvoiceOcrMathValidator
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .ela_detector import InvoiceElaAnalyzer
+    from .fraud_scorer import InvoiceFraudScorer
+    from .metadata_checker import InvoiceMetadataInspector
+    from .ocr_validator import InvoiceOcrMathValidator
+
+_LAZY_EXPORTS = {
+    "InvoiceElaAnalyzer": ".ela_detector",
+    "InvoiceFraudScorer": ".fraud_scorer",
+    "InvoiceMetadataInspector": ".metadata_checker",
+    "InvoiceOcrMathValidator": ".ocr_validator",
+}
 
 __all__ = [
     "InvoiceElaAnalyzer",
@@ -16,3 +32,20 @@ __all__ = [
     "InvoiceOcrMathValidator",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    """Import the module that defines a public detector class on first access."""
+
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    exported = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = exported
+    return exported
+
+
+def __dir__() -> list[str]:
+    """Include lazily exported names in dir(detector)."""
+
+    return sorted(set(globals()) | set(__all__))
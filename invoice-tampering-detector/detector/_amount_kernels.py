@@ -0,0 +1,101 @@
+"""Optional Numba kernels for the OCR amount checks.
+
+When Numba is installed, ``sum_mismatch`` and ``sorted_duplicates`` replace the
+NumPy/Python reductions in ``ocr_validator`` with single compiled passes, which
+removes the per-call interpreter and ufunc dispatch overhead on the short amount
+lists invoices produce. Without Numba, ``NUMBA_AVAILABLE`` is False, callers keep
+their NumPy implementation, and both functions fall back to the uncompiled kernels.
+Numba is imported and the kernels compiled on the first ``kernels_ready()`` call,
+not at import.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import Any
+
+import numpy as np
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+_sum_mismatch_jit: Any = None
+_sorted_duplicates_jit: Any = None
+_COMPILE_LOCK = threading.Lock()
+
+
+def _sum_mismatch_py(amount_values: np.ndarray, tolerance_ratio: float) -> bool:
+    """True when all amounts but the max (the total) miss the total by more than tolerance_ratio."""
+
+    if amount_values.size < 3:
+        return False
+
+    total_value = amount_values[0]
+    amount_sum = 0.0
+    for amount_value in amount_values:
+        total_value = max(total_value, amount_value)
+        amount_sum += amount_value
+    if total_value <= 0:
+        return False
+
+    line_items_sum = amount_sum - total_value
+    return abs(line_items_sum - total_value) / total_value > tolerance_ratio
+
+
+def _sorted_duplicates_py(amount_values: np.ndarray) -> np.ndarray:
+    """Return each cent-rounded amount that occurs more than once, ascending."""
+
+    rounded_values = np.empty(amount_values.size, dtype=np.float64)
+    for index in range(amount_values.size):
+        rounded_values[index] = np.rint(amount_values[index] * 100.0) / 100.0  # same as np.round(x, 2)
+    rounded_values.sort()
+
+    duplicates = np.empty(amount_values.size, dtype=np.float64)
+    duplicate_count = 0
+    for index in range(1, rounded_values.size):
+        value = rounded_values[index]
+        if value == rounded_values[index - 1] and (duplicate_count == 0 or duplicates[duplicate_count - 1] != value):
+            duplicates[duplicate_count] = value
+            duplicate_count += 1
+    return duplicates[:duplicate_count]
+
+
+def kernels_ready() -> bool:
+    """Compile both kernels on first use; False when Numba is missing or fails to compile."""
+
+    global NUMBA_AVAILABLE, _sum_mismatch_jit, _sorted_duplicates_jit
+
+    if not NUMBA_AVAILABLE:
+        return False
+    if _sorted_duplicates_jit is None:
+        with _COMPILE_LOCK:
+            if _sorted_duplicates_jit is None:
+                # Explicit signatures compile (or load from the on-disk cache) right here;
+                # any import/compile failure falls back to NumPy for good.
+                try:
+                    from numba import njit
+
+                    sum_mismatch_kernel = njit("boolean(float64[::1], float64)", cache=True)(_sum_mismatch_py)
+                    sorted_duplicates_kernel = njit("float64[::1](float64[::1])", cache=True)(
+                        _sorted_duplicates_py
+                    )
+                except Exception:  # noqa: BLE001 - any Numba/LLVM failure just disables the accelerator
+                    NUMBA_AVAILABLE = False
+                    return False
+                _sum_mismatch_jit = sum_mismatch_kernel
+                _sorted_duplicates_jit = sorted_duplicates_kernel
+    return True
+
+
+def sum_mismatch(amount_values: np.ndarray, tolerance_ratio: float) -> bool:
+    """Check line items (all but the max) against the max total within tolerance_ratio."""
+
+    kernel = _sum_mismatch_jit if kernels_ready() else _sum_mismatch_py
+    return bool(kernel(np.ascontiguousarray(amount_values, dtype=np.float64), float(tolerance_ratio)))
+
+
+def sorted_duplicates(amount_values: np.ndarray) -> list[float]:
+    """Return the duplicated cent-rounded amounts, each once, in ascending order."""
+
+    kernel = _sorted_duplicates_jit if kernels_ready() else _sorted_duplicates_py
+    return kernel(np.ascontiguousarray(amount_values, dtype=np.float64)).tolist()
@@ -0,0 +1,116 @@
+"""Optional Numba kernels for the ELA hot path.
+
+When Numba is installed, ``ela_difference_stats`` fuses the absolute difference,
+BT.601 luma and the mean/variance/max reductions into a single parallel pass over
+the image rows. Without Numba, ``NUMBA_AVAILABLE`` is False and callers use the
+OpenCV implementation in ``ela_detector``.
+
+Numba is imported and the kernel compiled on the first ``kernel_ready()`` call rather
+than at import, so importing the detectors (and every spawned worker) stays cheap.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import threading
+from typing import Any
+
+import numpy as np
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+# Rebound to numba.prange when the kernel is compiled; plain range keeps the Python body runnable.
+prange = range
+
+_ela_difference_stats_jit: Any = None
+
+# Numba's "workqueue" threading layer aborts on concurrent parallel launches,
+# and the fraud scorer runs detectors on a thread pool, so kernel calls are serialized.
+_KERNEL_LOCK = threading.Lock()
+
+
+def _ela_difference_stats_py(
+    original: np.ndarray, recompressed: np.ndarray, difference_out: np.ndarray
+) -> tuple[float, float, int]:
+    """Write |original - recompressed| into difference_out; return (luma sum, luma sum of squares, max)."""
+
+    height, width = original.shape[0], original.shape[1]
+    row_sums = np.zeros(height, dtype=np.float64)
+    row_squared_sums = np.zeros(height, dtype=np.float64)
+    row_maxima = np.zeros(height, dtype=np.int64)
+
+    for row in prange(height):
+        # Signed casts: under Numba, int() of a uint8 is unsigned and the subtraction would wrap.
+        luma_sum = 0.0
+        luma_squared_sum = 0.0
+        row_max = 0
+        for column in range(width):
+            red = abs(np.int32(original[row, column, 0]) - np.int32(recompressed[row, column, 0]))
+            green = abs(np.int32(original[row, column, 1]) - np.int32(recompressed[row, column, 1]))
+            blue = abs(np.int32(original[row, column, 2]) - np.int32(recompressed[row, column, 2]))
+            difference_out[row, column, 0] = red
+            difference_out[row, column, 1] = green
+            difference_out[row, column, 2] = blue
+
+            row_max = max(row_max, red, green, blue)
+            luma = 0.299 * red + 0.587 * green + 0.114 * blue
+            luma_sum += luma
+            luma_squared_sum += luma * luma
+
+        row_sums[row] = luma_sum
+        row_squared_sums[row] = luma_squared_sum
+        row_maxima[row] = row_max
+
+    return row_sums.sum(), row_squared_sums.sum(), row_maxima.max() if height else 0
+
+
+def kernel_ready() -> bool:
+    """Compile the kernel on first use; False when Numba is missing or fails to compile."""
+
+    global NUMBA_AVAILABLE, _ela_difference_stats_jit, prange
+
+    if not NUMBA_AVAILABLE:
+        return False
+    if _ela_difference_stats_jit is None:
+        with _KERNEL_LOCK:
+            if _ela_difference_stats_jit is None:
+                # A broken toolchain or unwritable cache dir must not take the detector down with
+                # it, so any import/compile failure drops back to the OpenCV path for good.
+                try:
+                    import numba
+                    from numba import njit, prange as numba_prange
+
+                    if numba.config.THREADING_LAYER == "default":
+                        # The first launch usually happens on the scorer's thread pool, and a TBB
+                        # pool started off the main thread hangs interpreter exit; workqueue has no
+                        # such issue (launches are serialized above), and its threads are not
+                        # capped by OMP_THREAD_LIMIT like the "omp" layer's would be.
+                        numba.config.THREADING_LAYER = "workqueue"
+                    prange = numba_prange
+                    compiled_kernel = njit(parallel=True, fastmath=True, cache=True)(_ela_difference_stats_py)
+                    warmup_pixels = np.zeros((2, 2, 3), dtype=np.uint8)
+                    compiled_kernel(warmup_pixels, warmup_pixels, np.empty_like(warmup_pixels))
+                except Exception:  # noqa: BLE001 - any Numba/LLVM failure just disables the accelerator
+                    NUMBA_AVAILABLE = False
+                    return False
+                _ela_difference_stats_jit = compiled_kernel
+    return True
+
+
+def ela_difference_stats(
+    original: np.ndarray, recompressed: np.ndarray
+) -> tuple[np.ndarray, float, float, int]:
+    """Return (difference pixels, luma mean, luma variance, max difference) for two HxWx3 uint8 arrays."""
+
+    original = np.ascontiguousarray(original, dtype=np.uint8)
+    recompressed = np.ascontiguousarray(recompressed, dtype=np.uint8)
+    difference_pixels = np.empty_like(original)
+
+    kernel = _ela_difference_stats_jit if kernel_ready() else _ela_difference_stats_py
+    with _KERNEL_LOCK:
+        luma_sum, luma_squared_sum, max_difference = kernel(original, recompressed, difference_pixels)
+
+    pixel_count = max(1, original.shape[0] * original.shape[1])
+    luma_mean = luma_sum / pixel_count
+    luma_variance = max(0.0, luma_squared_sum / pixel_count - luma_mean * luma_mean)
+    return difference_pixels, float(luma_mean), float(luma_variance), int(max_difference)
@@ -6,13 +6,27 @@ which often occurs after localized edits (copy/paste, text replacement, etc.).
 
 from __future__ import annotations
 
+import io
+import logging
 import os
-import tempfile
+import secrets
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from datetime import datetime, timezone
 from typing import Any
 
-from PIL import Image, ImageChops, ImageEnhance, ImageStat, UnidentifiedImageError
+import cv2
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+
+from . import _ela_kernels
+from .image_utils import as_rgb, shrink_image_to_max_width
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# Background PNG writes for deferred visualization saves; files are published atomically,
+# so readers simply wait for the final path to appear.
+_PNG_SAVE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ela-png")
 
 
 @dataclass(frozen=True)
@@ -25,10 +39,10 @@ class ElaMetrics:
     jpeg_quality: int
 
 
-def _utc_timestamp_compact() -> str:
-    """Return a filesystem-safe UTC timestamp string."""
+def _unique_token() -> str:
+    """Return a short, filesystem-safe random token for result file names."""
 
-    return datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S_%f")
+    return secrets.token_hex(8)
 
 
 def _ensure_directory(directory_path: str) -> None:
@@ -40,6 +54,14 @@ def _ensure_directory(directory_path: str) -> None:
         raise OSError(f"Failed to create directory: {directory_path}") from os_error
 
 
+def _log_failed_visualization_save(finished_save: Future[None]) -> None:
+    """Log a deferred PNG save that raised; nothing else ever reads its future."""
+
+    save_error = None if finished_save.cancelled() else finished_save.exception()
+    if save_error is not None:
+        _LOGGER.error("Deferred ELA visualization save failed", exc_info=save_error)
+
+
 def _risk_verdict_for_score(score: float, *, method_label: str) -> str:
     """Convert a 0–100 score into a human-readable verdict string."""
 
@@ -50,35 +72,75 @@ def _risk_verdict_for_score(score: float, *, method_label: str) -> str:
     return f"LOW {method_label} RISK"
 
 
-def _calculate_ela_difference(original_rgb: Image.Image, recompressed_rgb: Image.Image) -> dict[str, Any]:
-    """Compute ELA visualization and return it with the max pixel difference."""
+def _prepare_original_rgb(
+    invoice_image: Image.Image | np.ndarray, *, max_width_px: int | None
+) -> tuple[Image.Image, np.ndarray]:
+    """Return the (downscaled) RGB original both as a Pillow image and as a uint8 array."""
 
-    difference_image = ImageChops.difference(original_rgb, recompressed_rgb)
-    extrema_by_channel = difference_image.getextrema()
-    max_difference = max(channel_extrema[1] for channel_extrema in extrema_by_channel)
+    if isinstance(invoice_image, np.ndarray):
+        if not max_width_px or invoice_image.shape[1] <= max_width_px:
+            # Caller-owned buffer: read it in place, Pillow only needs its own copy to encode.
+            return Image.fromarray(invoice_image, mode="RGB"), invoice_image
+        invoice_image = Image.fromarray(invoice_image, mode="RGB")
 
-    if max_difference == 0:
-        return {"ela_image": difference_image, "max_difference": 0}
+    original_rgb = as_rgb(shrink_image_to_max_width(invoice_image, max_width_px=max_width_px))
+    return original_rgb, np.asarray(original_rgb, dtype=np.uint8)
 
-    scale_factor = 255.0 / float(max_difference)
-    enhanced_difference = ImageEnhance.Brightness(difference_image).enhance(scale_factor)
-    return {"ela_image": enhanced_difference, "max_difference": int(max_difference)}
 
+def _calculate_ela_difference(original_pixels: np.ndarray, recompressed_rgb: Image.Image) -> dict[str, Any]:
+    """Compute the per-pixel ELA difference, its luma mean/variance, and the max pixel difference."""
 
-def _measure_ela_metrics(ela_image: Image.Image, *, max_difference: int, jpeg_quality: int) -> ElaMetrics:
-    """Measure mean brightness and variance from the ELA image."""
+    recompressed_pixels = np.asarray(recompressed_rgb, dtype=np.uint8)
 
-    ela_grayscale = ela_image.convert("L")
-    grayscale_stats = ImageStat.Stat(ela_grayscale)
+    if _ela_kernels.kernel_ready():
+        difference_pixels, luma_mean, luma_variance, max_difference = _ela_kernels.ela_difference_stats(
+            original_pixels, recompressed_pixels
+        )
+        return {
+            "difference_pixels": difference_pixels,
+            "luma_mean": luma_mean,
+            "luma_variance": luma_variance,
+            "max_difference": max_difference,
+        }
+
+    # OpenCV's saturating uint8 kernels never leave uint8, so no HxWx3 float temporaries:
+    # |a - b|, BT.601 luma (same weights as Pillow's "L") and mean/stddev each run in one C pass.
+    difference_pixels = cv2.absdiff(original_pixels, recompressed_pixels)
+    grayscale_pixels = cv2.cvtColor(difference_pixels, cv2.COLOR_RGB2GRAY)
+    luma_mean, luma_stddev = cv2.meanStdDev(grayscale_pixels)
+    return {
+        "difference_pixels": difference_pixels,
+        "luma_mean": float(luma_mean[0, 0]),
+        "luma_variance": float(luma_stddev[0, 0]) ** 2,
+        "max_difference": int(difference_pixels.max()),
+    }
+
+
+def _measure_ela_metrics(
+    *, luma_mean: float, luma_variance: float, max_difference: int, jpeg_quality: int
+) -> ElaMetrics:
+    """Derive brightness mean and variance of the ELA image scaled so max_difference maps to 255."""
+
+    scale_factor = 255.0 / float(max_difference) if max_difference else 1.0
 
     return ElaMetrics(
-        brightness_mean=float(grayscale_stats.mean[0]),
-        brightness_variance=float(grayscale_stats.var[0]),
+        brightness_mean=float(luma_mean) * scale_factor,
+        brightness_variance=float(luma_variance) * scale_factor**2,
         max_pixel_difference=int(max_difference),
         jpeg_quality=int(jpeg_quality),
     )
 
 
+def _build_ela_visualization(difference_pixels: np.ndarray, *, max_difference: int) -> Image.Image:
+    """Brighten the raw difference so max_difference maps to 255 and wrap it as a Pillow image."""
+
+    if max_difference == 0:
+        return Image.fromarray(difference_pixels, mode="RGB")
+
+    scaled_pixels = cv2.convertScaleAbs(difference_pixels, alpha=255.0 / float(max_difference))
+    return Image.fromarray(scaled_pixels, mode="RGB")
+
+
 def _score_from_ela_metrics(ela_metrics: ElaMetrics) -> float:
     """Compute the ELA anomaly score from the measured metrics."""
 
@@ -93,6 +155,11 @@ def _score_from_ela_metrics(ela_metrics: ElaMetrics) -> float:
 class InvoiceElaAnalyzer:
     """Runs Error Level Analysis (ELA) and persists a visualization image."""
 
+    def __init__(self, *, defer_visualization_save: bool = False) -> None:
+        """Create an analyzer; defer_visualization_save writes PNGs on a background thread."""
+
+        self.defer_visualization_save = bool(defer_visualization_save)
+
     def analyze_image_path(
         self,
         image_path: str,
@@ -100,6 +167,7 @@ class InvoiceElaAnalyzer:
         jpeg_quality: int = 90,
         *,
         public_results_prefix: str | None = "/static/results",
+        max_width_px: int | None = 2000,
     ) -> dict[str, Any]:
         """Analyze an image file path and return a structured ELA report."""
 
@@ -110,6 +178,7 @@ class InvoiceElaAnalyzer:
                     results_directory,
                     jpeg_quality=jpeg_quality,
                     public_results_prefix=public_results_prefix,
+                    max_width_px=max_width_px,
                 )
         except (OSError, UnidentifiedImageError) as open_error:
             return {
@@ -122,21 +191,30 @@ class InvoiceElaAnalyzer:
 
     def analyze_invoice_image(
         self,
-        invoice_image: Image.Image,
+        invoice_image: Image.Image | np.ndarray,
         results_directory: str,
         *,
         jpeg_quality: int = 90,
         public_results_prefix: str | None = "/static/results",
+        max_width_px: int | None = 2000,
     ) -> dict[str, Any]:
-        """Run ELA on a Pillow image and save a visualization into results_directory."""
+        """Run ELA on a Pillow image or HxWx3 uint8 RGB array and save a visualization.
+
+        The input is downscaled to max_width_px first; arrays are only read, never modified.
+        """
 
         _ensure_directory(results_directory)
 
         try:
-            ela_observations = self._compute_ela_observations(invoice_image, jpeg_quality=jpeg_quality)
+            ela_observations = self._compute_ela_observations(
+                invoice_image, jpeg_quality=jpeg_quality, max_width_px=max_width_px
+            )
             ela_metrics: ElaMetrics = ela_observations["metrics"]
+            ela_image = _build_ela_visualization(
+                ela_observations["difference_pixels"], max_difference=ela_metrics.max_pixel_difference
+            )
             visualization_path = self._persist_visualization_and_get_path(
-                ela_observations["ela_image"],
+                ela_image,
                 results_directory=results_directory,
                 public_results_prefix=public_results_prefix,
             )
@@ -162,16 +240,26 @@ class InvoiceElaAnalyzer:
                 "error": str(ela_error),
             }
 
-    def _compute_ela_observations(self, invoice_image: Image.Image, *, jpeg_quality: int) -> dict[str, Any]:
-        """Compute ELA image + metrics without writing any files."""
+    def _compute_ela_observations(
+        self,
+        invoice_image: Image.Image | np.ndarray,
+        *,
+        jpeg_quality: int,
+        max_width_px: int | None = 2000,
+    ) -> dict[str, Any]:
+        """Compute the ELA difference + metrics without writing any files."""
 
-        original_rgb = invoice_image.convert("RGB")
+        original_rgb, original_pixels = _prepare_original_rgb(invoice_image, max_width_px=max_width_px)
         recompressed_rgb = self._recompress_and_reload_as_rgb(original_rgb, jpeg_quality=jpeg_quality)
-        ela_result = _calculate_ela_difference(original_rgb, recompressed_rgb)
+        ela_result = _calculate_ela_difference(original_pixels, recompressed_rgb)
 
-        ela_image: Image.Image = ela_result["ela_image"]
         max_difference: int = int(ela_result["max_difference"])
-        ela_metrics = _measure_ela_metrics(ela_image, max_difference=max_difference, jpeg_quality=jpeg_quality)
+        ela_metrics = _measure_ela_metrics(
+            luma_mean=ela_result["luma_mean"],
+            luma_variance=ela_result["luma_variance"],
+            max_difference=max_difference,
+            jpeg_quality=jpeg_quality,
+        )
 
         ela_score = _score_from_ela_metrics(ela_metrics)
         verdict = (
@@ -180,7 +268,12 @@ class InvoiceElaAnalyzer:
             else _risk_verdict_for_score(ela_score, method_label="ELA")
         )
 
-        return {"ela_image": ela_image, "metrics": ela_metrics, "score": ela_score, "verdict": verdict}
+        return {
+            "difference_pixels": ela_result["difference_pixels"],
+            "metrics": ela_metrics,
+            "score": ela_score,
+            "verdict": verdict,
+        }
 
     def _persist_visualization_and_get_path(
         self,
@@ -191,9 +284,14 @@ class InvoiceElaAnalyzer:
     ) -> str:
         """Save ELA visualization and return a path suitable for UI display."""
 
-        visualization_filename = f"ela_{_utc_timestamp_compact()}.png"
+        visualization_filename = f"ela_{_unique_token()}.png"
         visualization_file_path = os.path.join(results_directory, visualization_filename)
-        self._save_visualization(ela_image, visualization_file_path)
+
+        if self.defer_visualization_save:
+            pending_save = _PNG_SAVE_POOL.submit(self._save_visualization, ela_image, visualization_file_path)
+            pending_save.add_done_callback(_log_failed_visualization_save)
+        else:
+            self._save_visualization(ela_image, visualization_file_path)
 
         if public_results_prefix:
             return f"{public_results_prefix.rstrip('/')}/{visualization_filename}"
@@ -202,28 +300,42 @@ class InvoiceElaAnalyzer:
     def _recompress_and_reload_as_rgb(self, original_rgb: Image.Image, *, jpeg_quality: int) -> Image.Image:
         """Re-save an image as JPEG at the given quality and reload it as RGB."""
 
-        temporary_file_path: str | None = None
+        buffer = io.BytesIO()
         try:
-            with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as temp_file:
-                temporary_file_path = temp_file.name
-
-            original_rgb.save(temporary_file_path, "JPEG", quality=int(jpeg_quality))
-            with Image.open(temporary_file_path) as recompressed_image:
-                return recompressed_image.convert("RGB")
+            # ELA only needs the quantization artifacts, not a small file: pin the fastest
+            # baseline libjpeg path (no Huffman optimization, no progressive scans, 4:2:0).
+            original_rgb.save(
+                buffer,
+                format="JPEG",
+                quality=int(jpeg_quality),
+                optimize=False,
+                progressive=False,
+                subsampling=2,
+            )
+            buffer.seek(0)
+            with Image.open(buffer) as recompressed_image:
+                recompressed_image.load()
+                return as_rgb(recompressed_image)
         except OSError as io_error:
             raise OSError("Failed to recompress image for ELA.") from io_error
-        finally:
-            if temporary_file_path:
-                try:
-                    os.remove(temporary_file_path)
-                except OSError:
-                    pass
 
     def _save_visualization(self, ela_image: Image.Image, destination_path: str) -> None:
-        """Persist the ELA visualization image to disk."""
+        """Persist the ELA visualization image to disk (atomically)."""
 
+        temporary_path: str | None = f"{destination_path}.tmp"
         try:
-            ela_image.save(destination_path, "PNG")
+            # Fastest zlib level: the PNG is a transient UI preview, not an archive.
+            ela_image.save(temporary_path, "PNG", compress_level=1)
+            # Publish atomically so readers in other threads/processes never see a partial PNG.
+            os.replace(temporary_path, destination_path)
+            temporary_path = None
         except OSError as save_error:
             raise OSError(f"Failed to save ELA visualization: {destination_path}") from save_error
+        finally:
+            # Don't leave half-written PNGs behind in the results directory.
+            if temporary_path:
+                try:
+                    os.remove(temporary_path)
+                except OSError:
+                    pass
 
@@ -2,40 +2,58 @@
 
 from __future__ import annotations
 
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
+import numpy as np
 from pdf2image import convert_from_path
+from pdfminer.high_level import extract_text as extract_pdf_text
 from PIL import Image, UnidentifiedImageError
 
 from .ela_detector import InvoiceElaAnalyzer
+from .image_utils import as_rgb, shrink_image_to_max_width
 from .metadata_checker import InvoiceMetadataInspector
 from .ocr_validator import InvoiceOcrMathValidator
 
 
+# Pillow's codecs and the Tesseract subprocess both release the GIL, so threads
+# are enough to overlap the three detector checks for a single invoice.
+_DETECTOR_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="invoice-detector")
+
+_FINAL_VERDICTS = ("LOW RISK - Appears Authentic", "MEDIUM RISK - Requires Review", "HIGH RISK - Likely Tampered")
+
+
 def _final_verdict_from_score(final_score: float) -> str:
     """Translate a 0–100 fraud score into the required final verdict label."""
 
-    if final_score >= 65:
-        return "HIGH RISK - Likely Tampered"
-    if final_score >= 40:
-        return "MEDIUM RISK - Requires Review"
-    return "LOW RISK - Appears Authentic"
+    # Each threshold crossed bumps the index: < 40 -> LOW, 40-64 -> MEDIUM, >= 65 -> HIGH.
+    return _FINAL_VERDICTS[int(final_score >= 40) + int(final_score >= 65)]
 
 
-def _shrink_image_to_max_width(invoice_image: Image.Image, *, max_width_px: int) -> Image.Image:
-    """Downscale an image to max_width_px while keeping aspect ratio."""
+def _file_sha256(file_path: Path, *, chunk_bytes: int = 1024 * 1024) -> str:
+    """Hash a file's full contents in fixed-size chunks."""
 
-    if max_width_px <= 0:
-        return invoice_image
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_handle:
+        for chunk in iter(lambda: file_handle.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-    width_px, height_px = invoice_image.size
-    if width_px <= max_width_px:
-        return invoice_image
 
-    shrink_ratio = max_width_px / float(width_px)
-    resized_height_px = max(1, int(height_px * shrink_ratio))
-    return invoice_image.resize((int(max_width_px), int(resized_height_px)), Image.Resampling.LANCZOS)
+def _pdf_metadata_report() -> dict[str, Any]:
+    """Fixed metadata result for PDFs, which carry no EXIF."""
+
+    return {
+        "score": 50.0,
+        "verdict": "SUSPICIOUS - No EXIF metadata found",
+        "flags": ["PDF input has no EXIF metadata; metadata checks are limited."],
+        "metadata": {},
+        "error": None,
+    }
 
 
 def _score_value(result_payload: dict[str, Any], *, fallback: float) -> float:
@@ -56,18 +74,36 @@ class InvoiceFraudScorer:
         results_directory: str,
         public_results_prefix: str | None = "/static/results",
         max_image_width_px: int = 2000,
+        max_ocr_width_px: int = 1200,
         pdf_dpi: int = 200,
+        pdf_cache_size: int = 4,
+        min_pdf_text_chars: int = 100,
+        defer_visualization_save: bool = False,
+        skip_ocr_above_ela_score: float | None = None,
     ) -> None:
-        """Create a scorer with initialized detectors."""
+        """Create a scorer with initialized detectors.
+
+        When skip_ocr_above_ela_score is set, OCR waits for ELA and is skipped for invoices
+        whose ELA score reaches it (score None, so the weights renormalize over ELA and metadata);
+        by default OCR runs alongside ELA.
+        """
 
-        self.ela_analyzer = InvoiceElaAnalyzer()
+        self.ela_analyzer = InvoiceElaAnalyzer(defer_visualization_save=defer_visualization_save)
         self.metadata_inspector = InvoiceMetadataInspector()
         self.ocr_validator = InvoiceOcrMathValidator()
 
         self.results_directory = str(results_directory)
         self.public_results_prefix = public_results_prefix
         self.max_image_width_px = int(max_image_width_px)
+        self.max_ocr_width_px = int(max_ocr_width_px)
         self.pdf_dpi = int(pdf_dpi)
+        self.pdf_cache_size = int(pdf_cache_size)
+        self.min_pdf_text_chars = int(min_pdf_text_chars)
+        self.skip_ocr_above_ela_score = skip_ocr_above_ela_score
+
+        # Rendered first pages keyed by (content sha256, dpi) -> (mode, size, raw bytes).
+        self._pdf_render_cache: OrderedDict[tuple[str, int], tuple[str, tuple[int, int], bytes]] = OrderedDict()
+        self._pdf_render_cache_lock = threading.Lock()
 
     def analyze_invoice_file(self, invoice_file_path: str) -> dict[str, Any]:
         """Analyze an invoice file (JPG/PNG/PDF) and return a nested result dict."""
@@ -76,10 +112,23 @@ class InvoiceFraudScorer:
         extension = invoice_path.suffix.lower()
 
         if extension == ".pdf":
+            pdf_text = self._extract_pdf_text_layer(invoice_path)
+            if pdf_text is not None:
+                return self._analyze_digital_pdf_text(pdf_text)
+
             invoice_image = self._render_pdf_first_page(invoice_path)
             return self.analyze_invoice_image(invoice_image, is_pdf=True)
 
-        image_load = self._load_image_with_metadata(invoice_path)
+        image_load = self._load_image_with_metadata(str(invoice_path))
+        return self.analyze_invoice_image(
+            image_load["invoice_image"],
+            metadata_override=image_load["metadata_result"],
+        )
+
+    def analyze_invoice_stream(self, invoice_stream: IO[bytes]) -> dict[str, Any]:
+        """Analyze an in-memory JPG/PNG invoice (e.g. an upload) without touching disk."""
+
+        image_load = self._load_image_with_metadata(invoice_stream)
         return self.analyze_invoice_image(
             image_load["invoice_image"],
             metadata_override=image_load["metadata_result"],
@@ -94,13 +143,29 @@ class InvoiceFraudScorer:
     ) -> dict[str, Any]:
         """Analyze an already-loaded invoice image (used for PDF first-page rendering)."""
 
-        analysis_image = _shrink_image_to_max_width(invoice_image, max_width_px=self.max_image_width_px)
-
-        ela_result = self._run_ela_check(analysis_image)
-        metadata_result = (
-            metadata_override if metadata_override is not None else self._run_metadata_check(invoice_image, is_pdf=is_pdf)
+        # Decode, downscale and convert once; ELA reads the shared read-only RGB buffer
+        # and OCR derives its grayscale copy from the same image.
+        analysis_image = as_rgb(shrink_image_to_max_width(invoice_image, max_width_px=self.max_image_width_px))
+        analysis_pixels = np.asarray(analysis_image, dtype=np.uint8)
+        analysis_pixels.setflags(write=False)
+
+        ela_future = _DETECTOR_POOL.submit(self._run_ela_check, analysis_pixels)
+        metadata_future = (
+            None
+            if metadata_override is not None
+            else _DETECTOR_POOL.submit(self._run_metadata_check, invoice_image, is_pdf=is_pdf)
         )
-        ocr_result = self._run_ocr_check(analysis_image)
+
+        if self.skip_ocr_above_ela_score is None:
+            ocr_result = self._run_ocr_check(analysis_image)
+            ela_result = ela_future.result()
+        else:
+            # ELA is far cheaper than Tesseract, so waiting for it first costs little and
+            # skips the OCR call entirely on invoices ELA already flags.
+            ela_result = ela_future.result()
+            ocr_enabled = _score_value(ela_result, fallback=50.0) < self.skip_ocr_above_ela_score
+            ocr_result = self._run_ocr_check(analysis_image, enabled=ocr_enabled)
+        metadata_result = metadata_override if metadata_future is None else metadata_future.result()
 
         return self._assemble_fraud_report(ela_result, metadata_result, ocr_result)
 
@@ -110,12 +175,24 @@ class InvoiceFraudScorer:
         metadata_result: dict[str, Any],
         ocr_result: dict[str, Any],
     ) -> dict[str, Any]:
-        """Combine detector scores using the required weights and thresholds."""
-
+        """Combine detector scores using the required weights and thresholds.
+
+        A detector that did not run reports score None; it is left out and the remaining
+        weights are renormalized, so a skipped check never adds a made-up score.
+        """
+
+        weighted_scores = [
+            (weight, _score_value(result_payload, fallback=fallback))
+            for result_payload, weight, fallback in (
+                (ela_result, 0.4, 50.0),
+                (metadata_result, 0.3, 50.0),
+                (ocr_result, 0.3, 40.0),
+            )
+            if not ("score" in result_payload and result_payload["score"] is None)
+        ]
+        total_weight = sum(weight for weight, _ in weighted_scores)
         final_score = (
-            _score_value(ela_result, fallback=50.0) * 0.4
-            + _score_value(metadata_result, fallback=50.0) * 0.3
-            + _score_value(ocr_result, fallback=40.0) * 0.3
+            sum(weight * score for weight, score in weighted_scores) / total_weight if total_weight else 50.0
         )
 
         return {
@@ -126,28 +203,86 @@ class InvoiceFraudScorer:
             "ocr": ocr_result,
         }
 
+    def _extract_pdf_text_layer(self, invoice_path: Path) -> str | None:
+        """Return the first page's embedded text if the PDF is digitally generated, else None."""
+
+        try:
+            pdf_text = extract_pdf_text(str(invoice_path), maxpages=1)
+        except Exception:  # noqa: BLE001 - unreadable text layers fall back to rasterizing
+            return None
+
+        if len(pdf_text.strip()) < self.min_pdf_text_chars:
+            return None
+        return pdf_text
+
+    def _analyze_digital_pdf_text(self, pdf_text: str) -> dict[str, Any]:
+        """Score a digitally generated PDF from its text layer, skipping rendering, ELA and OCR."""
+
+        # No raster image means no ELA signal: score None keeps it out of the weighting.
+        ela_result = {
+            "score": None,
+            "verdict": "SKIPPED - Digitally generated PDF has no raster image",
+            "visualization_path": None,
+            "metrics": {},
+            "error": None,
+        }
+
+        try:
+            ocr_result = self.ocr_validator.validate_extracted_text(pdf_text, tolerance_ratio=0.15)
+        except Exception as text_error:  # noqa: BLE001 - keep pipeline running
+            ocr_result = {
+                "score": 40.0,
+                "verdict": "INCONCLUSIVE - PDF text validation failed",
+                "flags": ["Math validation of the PDF text layer failed unexpectedly."],
+                "extracted_text": "",
+                "amounts": [],
+                "error": str(text_error),
+            }
+
+        return self._assemble_fraud_report(ela_result, _pdf_metadata_report(), ocr_result)
+
     def _render_pdf_first_page(self, invoice_path: Path) -> Image.Image:
-        """Convert a PDF's first page into a Pillow RGB image."""
+        """Convert a PDF's first page into a Pillow RGB image, reusing renders of identical files."""
+
+        try:
+            cache_key = (_file_sha256(invoice_path), self.pdf_dpi)
+        except OSError as hash_error:
+            raise ValueError(f"Failed to read PDF: {hash_error}") from hash_error
+
+        with self._pdf_render_cache_lock:
+            cached_render = self._pdf_render_cache.get(cache_key)
+            if cached_render is not None:
+                self._pdf_render_cache.move_to_end(cache_key)
+        if cached_render is not None:
+            return Image.frombytes(*cached_render)
 
         try:
             rendered_pages = convert_from_path(str(invoice_path), dpi=self.pdf_dpi, first_page=1, last_page=1)
             if not rendered_pages:
                 raise ValueError("PDF conversion returned no pages.")
-            return rendered_pages[0].convert("RGB")
+            rendered_page = rendered_pages[0].convert("RGB")
         except Exception as pdf_error:
             raise ValueError(f"Failed to convert PDF to image: {pdf_error}") from pdf_error
 
-    def _load_image_with_metadata(self, invoice_path: Path) -> dict[str, Any]:
-        """Load an image file and capture metadata before the file handle is released."""
+        if self.pdf_cache_size > 0:
+            with self._pdf_render_cache_lock:
+                self._pdf_render_cache[cache_key] = (rendered_page.mode, rendered_page.size, rendered_page.tobytes())
+                while len(self._pdf_render_cache) > self.pdf_cache_size:
+                    self._pdf_render_cache.popitem(last=False)
+
+        return rendered_page
+
+    def _load_image_with_metadata(self, invoice_source: str | IO[bytes]) -> dict[str, Any]:
+        """Load an image path/stream and capture metadata before the file handle is released."""
 
         try:
-            with Image.open(str(invoice_path)) as opened_image:
+            with Image.open(invoice_source) as opened_image:
                 metadata_result = self._run_metadata_check(opened_image, is_pdf=False)
                 return {"invoice_image": opened_image.copy(), "metadata_result": metadata_result}
         except (OSError, UnidentifiedImageError) as image_error:
             raise ValueError(f"Failed to read invoice image: {image_error}") from image_error
 
-    def _run_ela_check(self, invoice_image: Image.Image) -> dict[str, Any]:
+    def _run_ela_check(self, invoice_image: Image.Image | np.ndarray) -> dict[str, Any]:
         """Run ELA even if upstream steps fail (returns structured error on exception)."""
 
         try:
@@ -156,6 +291,7 @@ class InvoiceFraudScorer:
                 self.results_directory,
                 jpeg_quality=90,
                 public_results_prefix=self.public_results_prefix,
+                max_width_px=self.max_image_width_px,
             )
         except Exception as ela_error:  # noqa: BLE001 - isolate ELA failures from other checks
             return {
@@ -170,13 +306,7 @@ class InvoiceFraudScorer:
         """Inspect EXIF metadata for images; PDFs have no EXIF so return a fixed result."""
 
         if is_pdf:
-            return {
-                "score": 50.0,
-                "verdict": "SUSPICIOUS - No EXIF metadata found",
-                "flags": ["PDF input has no EXIF metadata; metadata checks are limited."],
-                "metadata": {},
-                "error": None,
-            }
+            return _pdf_metadata_report()
 
         try:
             return self.metadata_inspector.inspect_invoice_image(invoice_image)
@@ -189,11 +319,17 @@ class InvoiceFraudScorer:
                 "error": str(metadata_error),
             }
 
-    def _run_ocr_check(self, invoice_image: Image.Image) -> dict[str, Any]:
+    def _run_ocr_check(self, invoice_image: Image.Image, *, enabled: bool = True) -> dict[str, Any]:
         """Run OCR and math checks with a tolerant total validation."""
 
+        if not enabled:
+            return self.ocr_validator.validate_invoice_image(invoice_image, enabled=False)
+
         try:
-            return self.ocr_validator.validate_invoice_image(invoice_image, tolerance_ratio=0.15)
+            # Tesseract binarizes internally and its runtime tracks pixel count, so hand it
+            # a smaller grayscale copy; ELA keeps the larger RGB image.
+            ocr_image = shrink_image_to_max_width(invoice_image, max_width_px=self.max_ocr_width_px).convert("L")
+            return self.ocr_validator.validate_invoice_image(ocr_image, tolerance_ratio=0.15)
         except Exception as ocr_error:  # noqa: BLE001 - keep pipeline running
             return {
                 "score": 40.0,
@@ -0,0 +1,35 @@
+"""Shared Pillow helpers used by several detectors."""
+
+from __future__ import annotations
+
+from PIL import Image
+
+
+def as_rgb(image: Image.Image) -> Image.Image:
+    """Return the image in RGB mode, skipping the full-buffer copy when it already is."""
+
+    return image if image.mode == "RGB" else image.convert("RGB")
+
+
+def shrink_image_to_max_width(invoice_image: Image.Image, *, max_width_px: int | None) -> Image.Image:
+    """Downscale an image to max_width_px while keeping aspect ratio."""
+
+    if not max_width_px or max_width_px <= 0:
+        return invoice_image
+
+    width_px, height_px = invoice_image.size
+    if width_px <= max_width_px:
+        return invoice_image
+
+    shrink_ratio = max_width_px / float(width_px)
+    target_size = (int(max_width_px), max(1, int(height_px * shrink_ratio)))
+
+    # Box-reduce by the integer part of the ratio in C first; the remaining (<2x)
+    # resize then touches far fewer pixels. Palette/bilevel images can't be averaged.
+    reduce_factor = width_px // max_width_px
+    if reduce_factor >= 2 and invoice_image.mode not in ("1", "P"):
+        invoice_image = invoice_image.reduce(reduce_factor)
+        if invoice_image.size == target_size:
+            return invoice_image
+
+    return invoice_image.resize(target_size, Image.Resampling.BILINEAR, reducing_gap=3.0)
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import re
 from typing import Any
 
 from PIL import ExifTags, Image, UnidentifiedImageError
 
 
+EDITING_SOFTWARE_REGEX = re.compile(r"photoshop|gimp|paint\.net|paint shop|adobe", re.IGNORECASE)
+CRITICAL_EXIF_FIELDS = ("Make", "Model", "DateTime")
+_METADATA_VERDICTS = ("LOW METADATA RISK", "MEDIUM METADATA RISK", "HIGH METADATA RISK")
+
+
 def _truncate_display_value(raw_value: Any, *, max_chars: int = 100) -> str:
     """Convert a metadata value to a display string and truncate it safely."""
 
@@ -18,6 +24,15 @@ def _truncate_display_value(raw_value: Any, *, max_chars: int = 100) -> str:
     except Exception:
         display_value = repr(raw_value)
 
+    # Common case: short single-line values need no copies at all.
+    if (
+        len(display_value) <= max_chars
+        and "\n" not in display_value
+        and not display_value[:1].isspace()
+        and not display_value[-1:].isspace()
+    ):
+        return display_value
+
     display_value = display_value.replace("\n", " ").strip()
     if len(display_value) <= max_chars:
         return display_value
@@ -27,11 +42,8 @@ def _truncate_display_value(raw_value: Any, *, max_chars: int = 100) -> str:
 def _risk_verdict_from_score(score: float) -> str:
     """Turn a metadata score into a short risk verdict."""
 
-    if score >= 65:
-        return "HIGH METADATA RISK"
-    if score >= 40:
-        return "MEDIUM METADATA RISK"
-    return "LOW METADATA RISK"
+    # Each threshold crossed bumps the index: < 40 -> LOW, 40-64 -> MEDIUM, >= 65 -> HIGH.
+    return _METADATA_VERDICTS[int(score >= 40) + int(score >= 65)]
 
 
 def _extract_exif_metadata(invoice_image: Image.Image) -> dict[str, str]:
@@ -39,7 +51,9 @@ def _extract_exif_metadata(invoice_image: Image.Image) -> dict[str, str]:
 
     exif_raw: dict[int, Any] | None
     try:
-        exif_raw = invoice_image._getexif()  # noqa: SLF001 - Pillow EXIF API is private
+        exif_ifd0 = invoice_image.getexif()
+        # DateTimeOriginal and friends live in the Exif sub-IFD, not IFD0.
+        exif_raw = {**exif_ifd0, **exif_ifd0.get_ifd(ExifTags.IFD.Exif)}
     except Exception:
         exif_raw = None
 
@@ -58,10 +72,7 @@ def _detect_editing_software(exif_metadata: dict[str, str]) -> str | None:
     """Detect common editing software markers from EXIF tags."""
 
     software_hint = exif_metadata.get("Software") or exif_metadata.get("ProcessingSoftware") or ""
-    searchable = software_hint.lower()
-
-    editing_markers = ["photoshop", "gimp", "paint.net", "paint shop", "adobe"]
-    if any(marker in searchable for marker in editing_markers) and software_hint:
+    if software_hint and EDITING_SOFTWARE_REGEX.search(software_hint):
         return software_hint
 
     return None
@@ -112,7 +123,7 @@ class InvoiceMetadataInspector:
             score += 20.0
             flags.append("DateTime differs from DateTimeOriginal (possible re-save or edit).")
 
-        missing_fields = [field for field in ("Make", "Model", "DateTime") if not exif_metadata.get(field)]
+        missing_fields = [field for field in CRITICAL_EXIF_FIELDS if not exif_metadata.get(field)]
         if missing_fields:
             score += 15.0
             flags.append(f"Missing critical EXIF fields: {', '.join(missing_fields)}")
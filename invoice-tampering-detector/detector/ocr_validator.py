@@ -2,21 +2,98 @@
 
 from __future__ import annotations
 
+import functools
+import hashlib
+import json
+import os
 import re
-from collections import Counter
-from typing import Any
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Literal
 
 import cv2
 import numpy as np
 import pytesseract
 from PIL import Image, UnidentifiedImageError
 
+from . import _amount_kernels
 
-AMOUNT_REGEX = re.compile(r"\$?\d+[,.]?\d*\.?\d{2}")
+try:
+    import tesserocr
+except ImportError:  # pragma: no cover - tesserocr is an optional accelerator
+    tesserocr = None
 
 
+# An amount is up to 12 digits with optional 3-digit thousands groups and a mandatory ".dd".
+# The lookarounds keep matches from starting or ending inside a longer number ("1.2.34",
+# "12.345") while still allowing leader dots or a comma before an amount ("Subtotal....45.00",
+# "Tax,8.00"); with no optional separator/digit runs the pattern matches without backtracking.
+AMOUNT_REGEX = re.compile(r"(?<!\d)(?<!\d[.,])\$?(?P<whole>\d{1,12}(?:[,.]\d{3})*)\.(?P<cents>\d{2})(?!\d)")
+
+# Bump whenever _preprocess_for_ocr / _extract_words_with_tesseract change what Tesseract
+# sees or returns, so cached OCR words from older pipelines are not reused.
+OCR_PREPROCESS_VERSION = "6"
+
+# Invoices are dense uniform text blocks; --psm 6 skips Tesseract's page layout analysis.
+DEFAULT_TESSERACT_CONFIG = "--psm 6"
+
+# Longest side handed to Tesseract; ~200-300 DPI for a letter-size page keeps text legible
+# while camera-sized uploads stop paying for pixels Tesseract doesn't need.
+DEFAULT_MAX_OCR_DIMENSION_PX = 2000
+
+# Above this share of isolated (salt-and-pepper) pixels, a thresholded scan gets a median blur.
+NOISY_SCAN_ISOLATED_PIXEL_FRACTION = 0.0005
+
+# Below this grayscale standard deviation (0-255) the page has no text worth sending to Tesseract.
+# Scanner noise on a blank sheet stays around 1-5, while even a sparse page of text is well above 10.
+# Measured before thresholding: Otsu splits pure noise roughly 50/50 into "ink" and paper.
+MIN_OCR_GRAYSCALE_STDDEV = 8.0
+
+# Words Tesseract is less sure of than this (0-100) are kept in the text but never parsed as amounts.
+MIN_OCR_WORD_CONFIDENCE = 50.0
+
+_OCR_VERDICTS = ("LOW OCR RISK", "MEDIUM OCR RISK", "HIGH OCR RISK")
+
+# Column order of Tesseract's TSV output (pytesseract.image_to_data / tesserocr GetTSVText).
+_TESSERACT_TSV_COLUMNS = (
+    "level",
+    "page_num",
+    "block_num",
+    "par_num",
+    "line_num",
+    "word_num",
+    "left",
+    "top",
+    "width",
+    "height",
+    "conf",
+    "text",
+)
+
+# Tesseract configs the in-process tesserocr engine can honour; anything else goes through pytesseract.
+_TESSEROCR_CONFIG_REGEX = re.compile(r"\s*(?:--psm\s+(?P<psm>\d{1,2}))?\s*")
+
+DEFAULT_OCR_CACHE_DIRECTORY = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "tamper-flag",
+    "ocr",
+)
+
+# Once cached OCR words exceed this many bytes on disk, the least recently used entries are evicted.
+DEFAULT_MAX_OCR_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=1)
 def _tesseract_is_available() -> dict[str, Any]:
-    """Return a small diagnostic dict describing Tesseract availability."""
+    """Return a small diagnostic dict describing Tesseract availability.
+
+    The probe spawns a subprocess, so the result is cached for the life of the
+    process; call ``_tesseract_is_available.cache_clear()`` to re-probe.
+    """
+
+    if tesserocr is not None:
+        return {"available": True, "version": str(tesserocr.tesseract_version()).splitlines()[0]}
 
     try:
         version = str(pytesseract.get_tesseract_version())
@@ -25,11 +102,111 @@ def _tesseract_is_available() -> dict[str, Any]:
         return {"available": False, "version": None, "error": str(version_error)}
 
 
-def _inconclusive_ocr_report(*, verdict: str, flags: list[str], error: str) -> dict[str, Any]:
-    """Return a consistent OCR response payload when OCR can't run."""
+def _resolve_tesseract_config(tesseract_config: str | None) -> str:
+    """Use the invoice-tuned default when the caller passes no Tesseract config."""
+
+    return DEFAULT_TESSERACT_CONFIG if tesseract_config is None else tesseract_config
+
+
+def _image_file_digest(image_path: str, *, chunk_bytes: int = 64 * 1024) -> str:
+    """Return the SHA-256 hex digest of an image file's bytes, read in chunks."""
+
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as image_file:
+        for chunk in iter(lambda: image_file.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _ocr_cache_key(
+    image_digest: str,
+    *,
+    tesseract_config: str,
+    max_ocr_dimension_px: int | None,
+    denoise: bool | Literal["auto"],
+    ocr_engine: str,
+) -> str:
+    """Hash the image digest together with everything that influences the OCR text, engine included."""
+
+    digest = hashlib.sha256(image_digest.encode("ascii"))
+    digest.update(b"\0" + ocr_engine.encode("utf-8"))
+    digest.update(b"\0" + tesseract_config.encode("utf-8"))
+    digest.update(b"\0" + str(max_ocr_dimension_px).encode("utf-8"))
+    digest.update(b"\0" + str(denoise).encode("utf-8"))
+    digest.update(b"\0" + OCR_PREPROCESS_VERSION.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_cached_ocr_words(cache_directory: str, cache_key: str) -> list[dict[str, Any]] | None:
+    """Return cached OCR words for cache_key, or None on a miss or unreadable entry."""
+
+    cache_path = os.path.join(cache_directory, f"{cache_key}.json")
+    try:
+        with open(cache_path, encoding="utf-8") as cache_file:
+            cached_words = json.load(cache_file).get("words")
+        os.utime(cache_path)  # a hit refreshes the entry's age for LRU eviction
+    except (OSError, ValueError, AttributeError):
+        return None
+    return cached_words if isinstance(cached_words, list) else None
+
+
+def _prune_ocr_cache(cache_directory: str, *, max_cache_bytes: int) -> None:
+    """Delete the least recently used cache entries until the directory fits in max_cache_bytes."""
+
+    cache_entries: list[tuple[float, int, str]] = []
+    try:
+        with os.scandir(cache_directory) as directory_entries:
+            for entry in directory_entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    entry_stat = entry.stat()
+                    cache_entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.path))
+    except OSError:
+        return
+
+    cache_bytes = sum(entry_size for _, entry_size, _ in cache_entries)
+    if cache_bytes <= max_cache_bytes:
+        return
+    cache_entries.sort()
+    for _, entry_size, entry_path in cache_entries:
+        try:
+            os.remove(entry_path)
+        except OSError:
+            continue
+        cache_bytes -= entry_size
+        if cache_bytes <= max_cache_bytes:
+            return
+
+
+def _write_cached_ocr_words(cache_directory: str, cache_key: str, ocr_words: list[dict[str, Any]]) -> None:
+    """Store OCR words atomically (temp file + os.replace); cache failures are ignored."""
+
+    temporary_path: str | None = None
+    try:
+        os.makedirs(cache_directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=cache_directory, suffix=".tmp", delete=False
+        ) as temporary_file:
+            temporary_path = temporary_file.name
+            json.dump({"words": ocr_words}, temporary_file)
+        os.replace(temporary_path, os.path.join(cache_directory, f"{cache_key}.json"))
+        temporary_path = None
+    except OSError:
+        pass
+    finally:
+        if temporary_path:
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+
+def _inconclusive_ocr_report(
+    *, verdict: str, flags: list[str], error: str | None, score: float | None = 40.0
+) -> dict[str, Any]:
+    """Return a consistent OCR response payload when OCR can't run (score None: the check didn't run)."""
 
     return {
-        "score": 40.0,
+        "score": score,
         "verdict": verdict,
         "flags": flags,
         "extracted_text": "",
@@ -41,57 +218,225 @@ def _inconclusive_ocr_report(*, verdict: str, flags: list[str], error: str) -> d
 def _risk_verdict_from_score(score: float) -> str:
     """Convert a 0–100 OCR score into a short verdict."""
 
-    if score >= 65:
-        return "HIGH OCR RISK"
-    if score >= 40:
-        return "MEDIUM OCR RISK"
-    return "LOW OCR RISK"
+    # Each threshold crossed bumps the index: < 40 -> LOW, 40-64 -> MEDIUM, >= 65 -> HIGH.
+    return _OCR_VERDICTS[int(score >= 40) + int(score >= 65)]
 
 
-def _parse_currency_amount(amount_text: str) -> float | None:
-    """Parse common OCR currency strings into a float (best-effort)."""
+def _amount_from_match(amount_match: re.Match[str]) -> float:
+    """Convert an AMOUNT_REGEX match into a float, dropping thousands separators."""
 
-    cleaned = amount_text.replace("$", "").replace(" ", "")
-    if "," in cleaned and "." in cleaned:
-        cleaned = cleaned.replace(",", "")
-    elif "," in cleaned and "." not in cleaned:
-        cleaned = cleaned.replace(",", ".")
+    whole, cents = amount_match.group("whole", "cents")
+    return float(f"{whole.replace(',', '').replace('.', '')}.{cents}")
 
-    try:
-        return float(cleaned)
-    except ValueError:
-        return None
 
+def _empty_uint8_buffer() -> np.ndarray:
+    """Return a zero-length uint8 buffer (grown on first use)."""
+
+    return np.empty(0, dtype=np.uint8)
+
+
+@dataclass
+class _PreprocessScratch:
+    """Reusable uint8 buffers for _preprocess_for_ocr, so batch OCR doesn't reallocate per page."""
+
+    resized: np.ndarray = field(default_factory=_empty_uint8_buffer)
+    binary: np.ndarray = field(default_factory=_empty_uint8_buffer)
+    denoised: np.ndarray = field(default_factory=_empty_uint8_buffer)
+
+    def view(self, buffer_name: str, shape: tuple[int, int]) -> np.ndarray:
+        """Return a C-contiguous (H, W) view of the named buffer, growing it only when too small."""
+
+        required_size = shape[0] * shape[1]
+        buffer = getattr(self, buffer_name)
+        if buffer.size < required_size:
+            buffer = np.empty(required_size, dtype=np.uint8)
+            setattr(self, buffer_name, buffer)
+        return buffer[:required_size].reshape(shape)
+
+
+def _isolated_pixel_fraction(binary_pixels: np.ndarray, *, row_step: int = 8) -> float:
+    """Estimate salt-and-pepper noise as the share of pixels unlike all 4 neighbours, on every row_step-th row."""
+
+    if binary_pixels.shape[0] < 3 or binary_pixels.shape[1] < 3:
+        return 0.0
+
+    center = binary_pixels[1:-1:row_step, 1:-1]
+    isolated = (
+        (center != binary_pixels[0:-2:row_step, 1:-1])
+        & (center != binary_pixels[2::row_step, 1:-1])
+        & (center != binary_pixels[1:-1:row_step, :-2])
+        & (center != binary_pixels[1:-1:row_step, 2:])
+    )
+    return np.count_nonzero(isolated) / float(center.size)
 
-def _preprocess_for_ocr(invoice_image: Image.Image) -> np.ndarray:
-    """Apply grayscale + OTSU threshold + median blur as OCR-friendly preprocessing."""
 
-    invoice_rgb = invoice_image.convert("RGB")
-    rgb_pixels = np.array(invoice_rgb)
-    grayscale = cv2.cvtColor(rgb_pixels, cv2.COLOR_RGB2GRAY)
-    _, thresholded = cv2.threshold(grayscale, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-    return cv2.medianBlur(thresholded, 3)
+def _grayscale_stddev(grayscale: np.ndarray) -> float:
+    """Return the standard deviation of a uint8 grayscale plane (one OpenCV pass, no float copy)."""
 
+    _, grayscale_stddev = cv2.meanStdDev(grayscale)
+    return float(grayscale_stddev[0, 0])
 
-def _extract_text_with_tesseract(preprocessed_image: np.ndarray, *, tesseract_config: str) -> str:
-    """Extract text using Tesseract from a preprocessed image array."""
 
-    return pytesseract.image_to_string(preprocessed_image, config=tesseract_config)
+def _grayscale_for_ocr(
+    invoice_image: Image.Image, *, max_dimension_px: int | None, scratch: _PreprocessScratch
+) -> np.ndarray:
+    """Return the invoice as a uint8 grayscale array, downscaled so its longest side fits max_dimension_px."""
+
+    # Pillow's "L" conversion applies the BT.601 luma weights in one C pass (and is a no-op
+    # for callers that already pass grayscale), avoiding an RGB array + cvtColor round-trip.
+    grayscale_image = invoice_image if invoice_image.mode == "L" else invoice_image.convert("L")
+    grayscale = np.asarray(grayscale_image, dtype=np.uint8)
+
+    height_px, width_px = grayscale.shape
+    if max_dimension_px and max(height_px, width_px) > max_dimension_px:
+        # Tesseract's runtime tracks pixel count; INTER_AREA is the cleanest downsampling filter.
+        shrink_ratio = max_dimension_px / float(max(height_px, width_px))
+        resized_size = (max(1, int(width_px * shrink_ratio)), max(1, int(height_px * shrink_ratio)))
+        grayscale = cv2.resize(
+            grayscale,
+            resized_size,
+            dst=scratch.view("resized", (resized_size[1], resized_size[0])),
+            interpolation=cv2.INTER_AREA,
+        )
+    return grayscale
+
+
+def _binarize_for_ocr(
+    grayscale: np.ndarray, *, denoise: bool | Literal["auto"], scratch: _PreprocessScratch
+) -> Image.Image:
+    """Apply OTSU threshold (+ median blur) to a grayscale array and return a 1-bit image."""
+
+    _, thresholded = cv2.threshold(
+        grayscale, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=scratch.view("binary", grayscale.shape)
+    )
+    if denoise == "auto":
+        denoise = _isolated_pixel_fraction(thresholded) > NOISY_SCAN_ISOLATED_PIXEL_FRACTION
+    if denoise:
+        thresholded = cv2.medianBlur(thresholded, 3, dst=scratch.view("denoised", thresholded.shape))
+    # fromarray shares the scratch memory; convert("1") makes the independent copy Tesseract gets.
+    return Image.fromarray(thresholded).convert("1", dither=Image.Dither.NONE)
+
+
+def _preprocess_for_ocr(
+    invoice_image: Image.Image,
+    *,
+    max_dimension_px: int | None = DEFAULT_MAX_OCR_DIMENSION_PX,
+    denoise: bool | Literal["auto"] = "auto",
+    scratch: _PreprocessScratch | None = None,
+) -> Image.Image:
+    """Apply grayscale + downscale + OTSU threshold (+ median blur) and return a 1-bit image.
+
+    Handing Tesseract an already-bilevel image lets it skip its own Otsu thresholding pass.
+    With denoise="auto" the median blur only runs when the thresholded scan looks speckled;
+    on clean scans (essentially no isolated pixels) the blur changes nothing.
+    OpenCV stages write into scratch's buffers; the returned image never aliases them.
+    """
+
+    if scratch is None:
+        scratch = _PreprocessScratch()
+
+    grayscale = _grayscale_for_ocr(invoice_image, max_dimension_px=max_dimension_px, scratch=scratch)
+    return _binarize_for_ocr(grayscale, denoise=denoise, scratch=scratch)
+
+
+def _extract_words_with_tesseract(preprocessed_image: Image.Image, *, tesseract_config: str) -> dict[str, list[Any]]:
+    """Run Tesseract on a preprocessed (1-bit) image and return its word-level data (Output.DICT)."""
+
+    return pytesseract.image_to_data(
+        preprocessed_image, config=tesseract_config, output_type=pytesseract.Output.DICT
+    )
+
+
+def _tesseract_data_from_tsv(tsv_text: str) -> dict[str, list[Any]]:
+    """Parse header-less Tesseract TSV rows into the same dict-of-columns shape as Output.DICT."""
+
+    tesseract_data: dict[str, list[Any]] = {column: [] for column in _TESSERACT_TSV_COLUMNS}
+    for tsv_row in tsv_text.splitlines():
+        cells = tsv_row.split("\t")
+        if len(cells) < len(_TESSERACT_TSV_COLUMNS) - 1:
+            continue
+        cells += [""] * (len(_TESSERACT_TSV_COLUMNS) - len(cells))  # empty trailing text cell
+        for column, cell in zip(_TESSERACT_TSV_COLUMNS, cells):
+            tesseract_data[column].append(cell)
+    return tesseract_data
+
+
+def _ocr_words_from_tesseract_data(tesseract_data: dict[str, list[Any]]) -> list[dict[str, Any]]:
+    """Keep recognized words with their confidence, bounding box and (block, paragraph, line) key."""
+
+    ocr_words: list[dict[str, Any]] = []
+    for row_index, word_text in enumerate(tesseract_data.get("text", [])):
+        word_text = str(word_text).strip()
+        confidence = float(tesseract_data["conf"][row_index])
+        if not word_text or confidence < 0:  # page/block/line rows carry conf -1
+            continue
+        ocr_words.append(
+            {
+                "text": word_text,
+                "conf": round(confidence, 1),
+                "bbox": [int(tesseract_data[column][row_index]) for column in ("left", "top", "width", "height")],
+                "line": [int(tesseract_data[column][row_index]) for column in ("block_num", "par_num", "line_num")],
+            }
+        )
+    return ocr_words
+
+
+def _text_from_ocr_words(ocr_words: list[dict[str, Any]]) -> str:
+    """Rebuild page text from OCR words: spaces within a line, newlines between lines."""
+
+    text_lines: list[list[str]] = []
+    previous_line = None
+    for ocr_word in ocr_words:
+        if ocr_word["line"] != previous_line:
+            text_lines.append([])
+            previous_line = ocr_word["line"]
+        text_lines[-1].append(ocr_word["text"])
+    return "\n".join(" ".join(line_words) for line_words in text_lines)
+
+
+def _tesserocr_page_seg_mode(tesseract_config: str) -> int | None:
+    """Return the --psm value for configs tesserocr can run (-1 when unset), or None otherwise."""
+
+    config_match = _TESSEROCR_CONFIG_REGEX.fullmatch(tesseract_config)
+    if config_match is None:
+        return None
+    page_seg_mode = config_match.group("psm")
+    return -1 if page_seg_mode is None else int(page_seg_mode)
 
 
 def _extract_amounts_from_text(extracted_text: str) -> dict[str, Any]:
     """Parse amounts from OCR text and return both display and numeric representations."""
 
-    raw_amounts = AMOUNT_REGEX.findall(extracted_text)
-    parsed_amounts: list[dict[str, Any]] = []
-    numeric_values: list[float] = []
+    # Every AMOUNT_REGEX match ends in ".dd", so text without a dot (blank scans, prose) can't
+    # contain one; the substring check is a C scan and skips the regex walk entirely.
+    if "." not in extracted_text:
+        return {"amounts": [], "numeric_values": []}
 
-    for raw_amount in raw_amounts:
-        parsed_value = _parse_currency_amount(raw_amount)
-        if parsed_value is None:
-            continue
-        parsed_amounts.append({"raw": raw_amount, "value": float(parsed_value)})
-        numeric_values.append(float(parsed_value))
+    parsed_pairs = [
+        (amount_match.group(0), _amount_from_match(amount_match))
+        for amount_match in AMOUNT_REGEX.finditer(extracted_text)
+    ]
+    parsed_amounts = [{"raw": raw_amount, "value": amount_value} for raw_amount, amount_value in parsed_pairs]
+    numeric_values = [amount_value for _, amount_value in parsed_pairs]
+
+    return {"amounts": parsed_amounts, "numeric_values": numeric_values}
+
+
+def _extract_amounts_from_words(ocr_words: list[dict[str, Any]], *, min_confidence: float) -> dict[str, Any]:
+    """Parse amounts from confident OCR words, keeping each amount's bounding box and confidence."""
+
+    parsed_amounts = [
+        {
+            "raw": amount_match.group(0),
+            "value": _amount_from_match(amount_match),
+            "bbox": ocr_word["bbox"],
+            "conf": ocr_word["conf"],
+        }
+        for ocr_word in ocr_words
+        if ocr_word["conf"] >= min_confidence and "." in ocr_word["text"]
+        for amount_match in AMOUNT_REGEX.finditer(ocr_word["text"])
+    ]
+    numeric_values = [parsed_amount["value"] for parsed_amount in parsed_amounts]
 
     return {"amounts": parsed_amounts, "numeric_values": numeric_values}
 
@@ -101,38 +446,60 @@ def _score_amount_consistency_checks(amount_values: list[float], *, tolerance_ra
 
     flags: list[str] = []
     score = 0.0
+    amount_array = np.asarray(amount_values, dtype=np.float64)
 
-    if len(amount_values) < 2:
+    if amount_array.size < 2:
         score += 40.0
         flags.append("Too few amounts detected by OCR (< 2).")
 
-    if amount_values:
-        rounded_values = [round(value, 2) for value in amount_values]
-        duplicates = [value for value, count in Counter(rounded_values).items() if count > 1]
-        if duplicates:
-            score += 20.0
-            duplicate_list = ", ".join(f"{value:.2f}" for value in sorted(duplicates))
-            flags.append(f"Duplicate amounts detected: {duplicate_list}")
+    duplicates = _find_duplicate_amounts(amount_array)
+    if duplicates:
+        score += 20.0
+        duplicate_list = ", ".join(f"{value:.2f}" for value in duplicates)
+        flags.append(f"Duplicate amounts detected: {duplicate_list}")
 
-    if _sum_mismatch_with_tolerance(amount_values, tolerance_ratio=tolerance_ratio):
+    if _sum_mismatch_with_tolerance(amount_array, tolerance_ratio=tolerance_ratio):
         score += 35.0
         flags.append("Line items do not sum to the total within the allowed tolerance.")
 
     return {"score": score, "flags": flags}
 
 
-def _sum_mismatch_with_tolerance(amount_values: list[float], *, tolerance_ratio: float) -> bool:
+def _find_duplicate_amounts(amount_array: np.ndarray, *, small_input_size: int = 20) -> list[float]:
+    """Return each amount that appears more than once (rounded to cents), sorted ascending."""
+
+    if _amount_kernels.kernels_ready():
+        return _amount_kernels.sorted_duplicates(amount_array)
+
+    if amount_array.size <= small_input_size:
+        # Typical invoices have a handful of amounts; a Python sort + adjacent scan beats NumPy call overhead.
+        rounded_values = sorted(round(float(value), 2) for value in amount_array)
+        return sorted({left for left, right in zip(rounded_values, rounded_values[1:]) if left == right})
+
+    rounded_array = np.round(amount_array, 2)
+    rounded_array.sort()
+    repeated = rounded_array[1:][rounded_array[1:] == rounded_array[:-1]]
+    # Sorted input keeps repeats grouped, so dropping adjacent equals yields each duplicate once.
+    if repeated.size:
+        repeated = repeated[np.concatenate(([True], repeated[1:] != repeated[:-1]))]
+    return repeated.tolist()
+
+
+def _sum_mismatch_with_tolerance(amount_values: list[float] | np.ndarray, *, tolerance_ratio: float) -> bool:
     """Check if line items (all but max) differ from max total beyond tolerance."""
 
-    if len(amount_values) < 3:
+    amount_array = np.asarray(amount_values, dtype=np.float64)
+    if _amount_kernels.kernels_ready():
+        return _amount_kernels.sum_mismatch(amount_array, tolerance_ratio)
+    if amount_array.size < 3:
         return False
 
-    sorted_values = sorted(amount_values)
-    total_value = sorted_values[-1]
+    # Only the max is needed, so skip the full sort: max + sum are two linear passes.
+    total_value = float(amount_array.max())
     if total_value <= 0:
         return False
 
-    line_items_sum = float(sum(sorted_values[:-1]))
+    line_items_sum = float(amount_array.sum()) - total_value
     mismatch_ratio = abs(line_items_sum - total_value) / total_value
     return mismatch_ratio > tolerance_ratio
 
@@ -140,12 +507,62 @@ def _sum_mismatch_with_tolerance(amount_values: list[float], *, tolerance_ratio:
 class InvoiceOcrMathValidator:
     """Run OCR and validate basic arithmetic consistency among detected amounts."""
 
-    def validate_image_path(self, image_path: str) -> dict[str, Any]:
-        """Validate OCR math checks for an image file path."""
+    def __init__(
+        self,
+        *,
+        ocr_cache_directory: str | None = DEFAULT_OCR_CACHE_DIRECTORY,
+        max_ocr_cache_bytes: int = DEFAULT_MAX_OCR_CACHE_BYTES,
+    ) -> None:
+        """Create a validator; OCR text for image paths is cached in ocr_cache_directory (None disables).
+
+        The cache is kept under max_ocr_cache_bytes by evicting the least recently used entries.
+        """
+
+        self.ocr_cache_directory = ocr_cache_directory
+        self.max_ocr_cache_bytes = int(max_ocr_cache_bytes)
+        # Persistent tesserocr handle (created on first use) so each page skips the
+        # pytesseract fork/exec + temp-file round-trip; the API is not thread-safe.
+        self._tesserocr_api: Any = None
+        self._tesserocr_failed = tesserocr is None
+        self._tesserocr_lock = threading.Lock()
+        # Per-thread so concurrent validations (scorer thread pool) never share preprocessing buffers.
+        self._preprocess_scratch = threading.local()
+
+    def validate_image_path(
+        self,
+        image_path: str,
+        *,
+        tolerance_ratio: float = 0.15,
+        tesseract_config: str | None = None,
+        max_ocr_dimension_px: int | None = DEFAULT_MAX_OCR_DIMENSION_PX,
+        denoise: bool | Literal["auto"] = "auto",
+    ) -> dict[str, Any]:
+        """Validate OCR math checks for an image file path, reusing cached OCR words for identical files."""
 
+        resolved_config = _resolve_tesseract_config(tesseract_config)
         try:
+            image_digest = _image_file_digest(image_path) if self.ocr_cache_directory else None
+            if image_digest is not None:
+                cached_words = _read_cached_ocr_words(
+                    self.ocr_cache_directory,
+                    _ocr_cache_key(
+                        image_digest,
+                        tesseract_config=resolved_config,
+                        max_ocr_dimension_px=max_ocr_dimension_px,
+                        denoise=denoise,
+                        ocr_engine=self._ocr_engine_label(resolved_config),
+                    ),
+                )
+                if cached_words is not None:
+                    return self.validate_ocr_words(cached_words, tolerance_ratio=tolerance_ratio)
+
             with Image.open(image_path) as opened_image:
-                return self.validate_invoice_image(opened_image)
+                ocr_outcome = self._recognize_invoice_words(
+                    opened_image,
+                    tesseract_config=tesseract_config,
+                    max_ocr_dimension_px=max_ocr_dimension_px,
+                    denoise=denoise,
+                )
         except (OSError, UnidentifiedImageError) as open_error:
             return {
                 "score": 40.0,
@@ -156,37 +573,180 @@ class InvoiceOcrMathValidator:
                 "error": str(open_error),
             }
 
+        if ocr_outcome["report"] is not None:
+            return ocr_outcome["report"]
+
+        if image_digest is not None:
+            # Keyed after OCR ran: if tesserocr failed to load mid-call, the words came from pytesseract.
+            cache_key = _ocr_cache_key(
+                image_digest,
+                tesseract_config=resolved_config,
+                max_ocr_dimension_px=max_ocr_dimension_px,
+                denoise=denoise,
+                ocr_engine=self._ocr_engine_label(resolved_config),
+            )
+            _write_cached_ocr_words(self.ocr_cache_directory, cache_key, ocr_outcome["ocr_words"])
+            _prune_ocr_cache(self.ocr_cache_directory, max_cache_bytes=self.max_ocr_cache_bytes)
+        return self.validate_ocr_words(ocr_outcome["ocr_words"], tolerance_ratio=tolerance_ratio)
+
     def validate_invoice_image(
         self,
         invoice_image: Image.Image,
         *,
         tolerance_ratio: float = 0.15,
         tesseract_config: str | None = None,
+        max_ocr_dimension_px: int | None = DEFAULT_MAX_OCR_DIMENSION_PX,
+        denoise: bool | Literal["auto"] = "auto",
+        enabled: bool = True,
     ) -> dict[str, Any]:
-        """Run OCR extraction and scoring with a ±tolerance_ratio total check."""
+        """Run OCR extraction and scoring with a ±tolerance_ratio total check.
 
-        tesseract_status = _tesseract_is_available()
-        if not bool(tesseract_status.get("available")):
+        Images whose longest side exceeds max_ocr_dimension_px are downscaled before OCR
+        (None disables the cap). denoise forces the median blur on or off; "auto" only blurs
+        scans that look speckled after thresholding. enabled=False skips OCR and returns a
+        "SKIPPED" report with score None (left out of the fraud score), for callers that
+        already have a decisive score.
+        """
+
+        if not enabled:
             return _inconclusive_ocr_report(
-                verdict="INCONCLUSIVE - Tesseract not installed",
-                flags=["Tesseract OCR is not available; install it to enable OCR checks."],
-                error=str(tesseract_status.get("error") or "Tesseract not found"),
+                verdict="SKIPPED - OCR disabled",
+                flags=["OCR checks were skipped for this invoice."],
+                error=None,
+                score=None,
             )
 
+        ocr_outcome = self._recognize_invoice_words(
+            invoice_image,
+            tesseract_config=tesseract_config,
+            max_ocr_dimension_px=max_ocr_dimension_px,
+            denoise=denoise,
+        )
+        if ocr_outcome["report"] is not None:
+            return ocr_outcome["report"]
+        return self.validate_ocr_words(ocr_outcome["ocr_words"], tolerance_ratio=tolerance_ratio)
+
+    def _recognize_invoice_words(
+        self,
+        invoice_image: Image.Image,
+        *,
+        tesseract_config: str | None,
+        max_ocr_dimension_px: int | None = DEFAULT_MAX_OCR_DIMENSION_PX,
+        denoise: bool | Literal["auto"] = "auto",
+    ) -> dict[str, Any]:
+        """Run Tesseract; return the recognized words, or an inconclusive report when OCR can't run."""
+
+        tesseract_status = dict(_tesseract_is_available())
+        if not bool(tesseract_status.get("available")):
+            return {
+                "ocr_words": None,
+                "report": _inconclusive_ocr_report(
+                    verdict="INCONCLUSIVE - Tesseract not installed",
+                    flags=["Tesseract OCR is not available; install it to enable OCR checks."],
+                    error=str(tesseract_status.get("error") or "Tesseract not found"),
+                ),
+            }
+
         try:
-            preprocessed = _preprocess_for_ocr(invoice_image)
-            extracted_text = _extract_text_with_tesseract(
-                preprocessed, tesseract_config=tesseract_config or ""
+            scratch = self._thread_preprocess_scratch()
+            grayscale = _grayscale_for_ocr(invoice_image, max_dimension_px=max_ocr_dimension_px, scratch=scratch)
+            if _grayscale_stddev(grayscale) < MIN_OCR_GRAYSCALE_STDDEV:
+                return {
+                    "ocr_words": None,
+                    "report": _inconclusive_ocr_report(
+                        verdict="INCONCLUSIVE - No text detected",
+                        flags=["The page has almost no contrast; the image may be blank."],
+                        error=None,
+                    ),
+                }
+            preprocessed = _binarize_for_ocr(grayscale, denoise=denoise, scratch=scratch)
+            ocr_words = _ocr_words_from_tesseract_data(
+                self._run_tesseract(preprocessed, tesseract_config=_resolve_tesseract_config(tesseract_config))
             )
         except Exception as ocr_error:  # noqa: BLE001 - OCR can fail for many image-specific reasons
-            return _inconclusive_ocr_report(
-                verdict="INCONCLUSIVE - OCR extraction failed",
-                flags=["OCR extraction failed; poor scan quality can trigger this."],
-                error=str(ocr_error),
-            )
+            return {
+                "ocr_words": None,
+                "report": _inconclusive_ocr_report(
+                    verdict="INCONCLUSIVE - OCR extraction failed",
+                    flags=["OCR extraction failed; poor scan quality can trigger this."],
+                    error=str(ocr_error),
+                ),
+            }
+
+        return {"ocr_words": ocr_words, "report": None}
+
+    def _ocr_engine_label(self, tesseract_config: str) -> str:
+        """Name the engine that runs tesseract_config plus the Tesseract version, for OCR cache keys."""
+
+        uses_tesserocr = not self._tesserocr_failed and _tesserocr_page_seg_mode(tesseract_config) is not None
+        tesseract_version = _tesseract_is_available().get("version")
+        return f"{'tesserocr' if uses_tesserocr else 'pytesseract'} {tesseract_version}"
+
+    def _thread_preprocess_scratch(self) -> _PreprocessScratch:
+        """Return this thread's preprocessing buffers, creating them on first use."""
+
+        scratch = getattr(self._preprocess_scratch, "buffers", None)
+        if scratch is None:
+            scratch = _PreprocessScratch()
+            self._preprocess_scratch.buffers = scratch
+        return scratch
+
+    def _run_tesseract(self, preprocessed_image: Image.Image, *, tesseract_config: str) -> dict[str, list[Any]]:
+        """OCR with the persistent tesserocr API when possible, else fall back to pytesseract."""
+
+        page_seg_mode = _tesserocr_page_seg_mode(tesseract_config)
+        if not self._tesserocr_failed and page_seg_mode is not None:
+            with self._tesserocr_lock:
+                tesserocr_api = self._get_tesserocr_api()
+                if tesserocr_api is not None:
+                    if page_seg_mode >= 0:
+                        tesserocr_api.SetPageSegMode(page_seg_mode)
+                    else:
+                        tesserocr_api.SetPageSegMode(tesserocr.PSM.AUTO)
+                    tesserocr_api.SetImage(preprocessed_image)
+                    return _tesseract_data_from_tsv(tesserocr_api.GetTSVText(0))
+
+        return _extract_words_with_tesseract(preprocessed_image, tesseract_config=tesseract_config)
+
+    def _get_tesserocr_api(self) -> Any:
+        """Create the tesserocr API on first use; return None (and stop retrying) if it can't load."""
+
+        if self._tesserocr_api is None and not self._tesserocr_failed:
+            try:
+                self._tesserocr_api = tesserocr.PyTessBaseAPI(lang="eng")
+            except Exception:  # noqa: BLE001 - missing tessdata/language packs; pytesseract still works
+                self._tesserocr_failed = True
+        return self._tesserocr_api
+
+    def validate_ocr_words(
+        self,
+        ocr_words: list[dict[str, Any]],
+        *,
+        tolerance_ratio: float = 0.15,
+        min_word_confidence: float = MIN_OCR_WORD_CONFIDENCE,
+    ) -> dict[str, Any]:
+        """Score amounts found in Tesseract words; only words at or above min_word_confidence are parsed."""
+
+        amount_bundle = _extract_amounts_from_words(ocr_words, min_confidence=min_word_confidence)
+        return self._score_amount_bundle(
+            _text_from_ocr_words(ocr_words), amount_bundle, tolerance_ratio=tolerance_ratio
+        )
+
+    def validate_extracted_text(self, extracted_text: str, *, tolerance_ratio: float = 0.15) -> dict[str, Any]:
+        """Score amounts in already-extracted text (e.g. a PDF's native text layer)."""
 
-        extracted_text_display = extracted_text.replace("\x00", "")[:500]
         amount_bundle = _extract_amounts_from_text(extracted_text)
+        return self._score_amount_bundle(extracted_text, amount_bundle, tolerance_ratio=tolerance_ratio)
+
+    def _score_amount_bundle(
+        self, extracted_text: str, amount_bundle: dict[str, Any], *, tolerance_ratio: float
+    ) -> dict[str, Any]:
+        """Build the OCR report from parsed amounts and the text they came from."""
+
+        # Only 500 characters are shown, so strip NULs from the whole text only when the head has any.
+        extracted_text_display = extracted_text[:500]
+        if "\x00" in extracted_text_display:
+            extracted_text_display = extracted_text.replace("\x00", "")[:500]
         numeric_values: list[float] = amount_bundle["numeric_values"]
 
         scoring_bundle = _score_amount_consistency_checks(numeric_values, tolerance_ratio=tolerance_ratio)
@@ -201,4 +761,3 @@ class InvoiceOcrMathValidator:
             "amounts": amount_bundle["amounts"],
             "error": None,
         }
-
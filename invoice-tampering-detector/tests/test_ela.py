@@ -2,12 +2,34 @@
 
 from __future__ import annotations
 
+import logging
+import time
 from pathlib import Path
 
+import numpy as np
+import pytest
 from PIL import Image
 
+from detector import _ela_kernels, ela_detector
 from detector.ela_detector import InvoiceElaAnalyzer
 
+# Captured before the fixture below patches the flag per test.
+_NUMBA_KERNEL_READY = _ela_kernels.NUMBA_AVAILABLE
+
+
+@pytest.fixture(
+    autouse=True,
+    params=[
+        False,
+        pytest.param(True, marks=pytest.mark.skipif(not _NUMBA_KERNEL_READY, reason="numba not installed")),
+    ],
+    ids=["opencv", "numba"],
+)
+def _ela_kernel_mode(request, monkeypatch) -> None:
+    """Run every ELA test through the OpenCV path, and through the Numba kernel when installed."""
+
+    monkeypatch.setattr(_ela_kernels, "NUMBA_AVAILABLE", request.param)
+
 
 def test_scores_identical_recompression_as_suspicious_missing_compression_artifacts(tmp_path: Path) -> None:
     """If recompression produces no differences, ELA should return score=50 as specified."""
@@ -45,3 +67,114 @@ def test_returns_inconclusive_on_unreadable_image_path(tmp_path: Path) -> None:
     assert result["error"]
 
 
+def test_recompression_round_trips_in_memory(tmp_path: Path) -> None:
+    """JPEG recompression should return an RGB image of the same size without touching disk."""
+
+    invoice_image = Image.new("RGB", (48, 32), color=(200, 120, 40))
+    recompressed = InvoiceElaAnalyzer()._recompress_and_reload_as_rgb(invoice_image, jpeg_quality=90)
+
+    assert recompressed.mode == "RGB"
+    assert recompressed.size == invoice_image.size
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_downscales_wide_images_before_recompression(tmp_path: Path) -> None:
+    """ELA should run (and save its visualization) at no more than max_width_px wide."""
+
+    invoice_image = Image.new("RGB", (400, 100), color=(90, 160, 30))
+    result = InvoiceElaAnalyzer().analyze_invoice_image(
+        invoice_image,
+        str(tmp_path),
+        public_results_prefix=None,
+        max_width_px=100,
+    )
+
+    with Image.open(result["visualization_path"]) as visualization:
+        assert visualization.size == (100, 25)
+
+
+def test_runs_ela_on_lossless_png_sources(tmp_path: Path) -> None:
+    """PNG inputs are recompressed and measured like JPEGs instead of getting a fixed score."""
+
+    invoice_path = tmp_path / "invoice.png"
+    rgb_pixels = np.full((48, 64, 3), 250, dtype=np.uint8)
+    rgb_pixels[16:24, 8:56] = np.random.default_rng(3).integers(0, 256, (8, 48, 3), dtype=np.uint8)
+    Image.fromarray(rgb_pixels).save(invoice_path)
+
+    result = InvoiceElaAnalyzer().analyze_image_path(str(invoice_path), str(tmp_path), public_results_prefix=None)
+
+    assert result["metrics"]["max_pixel_difference"] > 0
+    assert "compression artifacts" not in result["verdict"].lower()
+    assert Path(result["visualization_path"]).exists()
+
+
+def test_deferred_visualization_save_lands_on_disk(tmp_path: Path) -> None:
+    """Deferred saves return the path immediately and the PNG appears shortly after."""
+
+    ela_analyzer = InvoiceElaAnalyzer(defer_visualization_save=True)
+    result = ela_analyzer.analyze_invoice_image(
+        Image.new("RGB", (64, 64), color=(120, 60, 200)),
+        str(tmp_path),
+        public_results_prefix=None,
+    )
+
+    visualization_path = Path(result["visualization_path"])
+    deadline = time.monotonic() + 5.0
+    while not visualization_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert visualization_path.exists()
+
+
+def test_failed_deferred_save_is_logged_and_cleaned_up(tmp_path: Path, monkeypatch, caplog) -> None:
+    """A background save that fails must show up in the logs and leave no temp file behind."""
+
+    def fail_replace(source_path, destination_path):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(ela_detector.os, "replace", fail_replace)
+
+    with caplog.at_level(logging.ERROR, logger=ela_detector.__name__):
+        InvoiceElaAnalyzer(defer_visualization_save=True).analyze_invoice_image(
+            Image.new("RGB", (64, 64), color=(120, 60, 200)),
+            str(tmp_path),
+            public_results_prefix=None,
+        )
+        deadline = time.monotonic() + 5.0
+        while not caplog.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert "Deferred ELA visualization save failed" in caplog.text
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_accepts_read_only_rgb_arrays(tmp_path: Path) -> None:
+    """A shared read-only NumPy buffer should be analyzed without copying it back into Pillow first."""
+
+    rgb_pixels = np.full((40, 60, 3), 180, dtype=np.uint8)
+    rgb_pixels[10:20, 10:30] = (20, 40, 60)
+    rgb_pixels.setflags(write=False)
+
+    result = InvoiceElaAnalyzer().analyze_invoice_image(rgb_pixels, str(tmp_path), public_results_prefix=None)
+
+    assert result["error"] is None
+    assert result["metrics"]["max_pixel_difference"] > 0
+
+
+def test_numba_kernel_matches_numpy_statistics() -> None:
+    """The optional fused kernel must agree with the NumPy reference implementation."""
+
+    if not _NUMBA_KERNEL_READY:
+        pytest.skip("numba not installed")
+
+    rng = np.random.default_rng(7)
+    original = rng.integers(0, 256, (30, 20, 3), dtype=np.uint8)
+    recompressed = rng.integers(0, 256, (30, 20, 3), dtype=np.uint8)
+
+    difference, luma_mean, luma_variance, max_difference = _ela_kernels.ela_difference_stats(original, recompressed)
+
+    expected_difference = np.abs(original.astype(np.int16) - recompressed.astype(np.int16)).astype(np.uint8)
+    expected_luma = expected_difference @ np.array([0.299, 0.587, 0.114])
+    assert np.array_equal(difference, expected_difference)
+    assert max_difference == int(expected_difference.max())
+    assert luma_mean == pytest.approx(expected_luma.mean())
+    assert luma_variance == pytest.approx(expected_luma.var())
@@ -0,0 +1,118 @@
+"""Fraud scorer unit tests (orchestration and weighting)."""
+
+from __future__ import annotations
+
+import io
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from detector import fraud_scorer as fraud_scorer_module
+from detector.fraud_scorer import InvoiceFraudScorer
+
+
+def test_runs_every_detector_and_keeps_metadata_override(tmp_path: Path) -> None:
+    """Concurrent detector checks should still produce one report with all three sections."""
+
+    fraud_scorer = InvoiceFraudScorer(results_directory=str(tmp_path), public_results_prefix=None)
+    metadata_override = {"score": 0.0, "verdict": "LOW METADATA RISK", "flags": [], "metadata": {}, "error": None}
+
+    analysis = fraud_scorer.analyze_invoice_image(
+        Image.new("RGB", (64, 48), color=(240, 240, 240)),
+        metadata_override=metadata_override,
+    )
+
+    assert analysis["metadata"] is metadata_override
+    assert analysis["ela"]["score"] == 50.0
+    assert "score" in analysis["ocr"]
+    assert 0.0 <= analysis["final_score"] <= 100.0
+
+
+def test_reuses_pdf_render_for_identical_files(tmp_path: Path, monkeypatch) -> None:
+    """Re-uploading the same PDF bytes should not re-run the PDF rasterizer."""
+
+    render_calls: list[str] = []
+
+    def fake_convert_from_path(pdf_path, **_kwargs):
+        render_calls.append(pdf_path)
+        return [Image.new("RGB", (20, 30), color=(255, 255, 255))]
+
+    monkeypatch.setattr(fraud_scorer_module, "convert_from_path", fake_convert_from_path)
+
+    first_pdf = tmp_path / "first.pdf"
+    second_pdf = tmp_path / "second.pdf"
+    first_pdf.write_bytes(b"%PDF-1.4 same bytes")
+    second_pdf.write_bytes(b"%PDF-1.4 same bytes")
+
+    fraud_scorer = InvoiceFraudScorer(results_directory=str(tmp_path), public_results_prefix=None)
+    first_render = fraud_scorer._render_pdf_first_page(first_pdf)
+    second_render = fraud_scorer._render_pdf_first_page(second_pdf)
+
+    assert len(render_calls) == 1
+    assert second_render.size == first_render.size
+    assert second_render is not first_render
+
+
+def test_analyzes_in_memory_uploads(tmp_path: Path) -> None:
+    """Image bytes should be analyzable from a stream, including the metadata check."""
+
+    invoice_bytes = io.BytesIO()
+    Image.new("RGB", (40, 40), color=(250, 250, 250)).save(invoice_bytes, format="PNG")
+    invoice_bytes.seek(0)
+
+    fraud_scorer = InvoiceFraudScorer(results_directory=str(tmp_path), public_results_prefix=None)
+    analysis = fraud_scorer.analyze_invoice_stream(invoice_bytes)
+
+    assert "no exif" in analysis["metadata"]["verdict"].lower()
+    assert analysis["ela"]["error"] is None
+
+
+def test_scores_digital_pdfs_from_their_text_layer(tmp_path: Path, monkeypatch) -> None:
+    """PDFs with a native text layer skip rasterizing and feed their text straight to the math checks."""
+
+    def fail_if_rendered(*_args, **_kwargs):
+        raise AssertionError("digitally generated PDFs should not be rasterized")
+
+    pdf_text = "ACME Corp invoice INV-A\nWidget A $120.00\nWidget B $80.00\nShipping $10.00\nTotal $210.00\n"
+    monkeypatch.setattr(fraud_scorer_module, "convert_from_path", fail_if_rendered)
+    monkeypatch.setattr(fraud_scorer_module, "extract_pdf_text", lambda *_args, **_kwargs: pdf_text)
+
+    invoice_pdf = tmp_path / "digital.pdf"
+    invoice_pdf.write_bytes(b"%PDF-1.4")
+
+    fraud_scorer = InvoiceFraudScorer(results_directory=str(tmp_path), public_results_prefix=None, min_pdf_text_chars=20)
+    analysis = fraud_scorer.analyze_invoice_file(str(invoice_pdf))
+
+    assert analysis["ela"]["verdict"].startswith("SKIPPED")
+    assert [amount["value"] for amount in analysis["ocr"]["amounts"]] == [120.0, 80.0, 10.0, 210.0]
+    assert analysis["ocr"]["score"] == 0.0
+    assert analysis["ela"]["score"] is None
+    # Only metadata (50 x 0.3) and OCR (0 x 0.3) count, renormalized over their 0.6 weight.
+    assert analysis["final_score"] == 25.0
+    assert analysis["verdict"].startswith("LOW RISK")
+
+
+def test_skips_ocr_when_ela_score_reaches_the_threshold(tmp_path: Path) -> None:
+    """With skip_ocr_above_ela_score set, a decisive ELA score skips OCR and drops it from the weighting."""
+
+    fraud_scorer = InvoiceFraudScorer(
+        results_directory=str(tmp_path), public_results_prefix=None, skip_ocr_above_ela_score=80.0
+    )
+    fraud_scorer._run_ela_check = lambda *_args, **_kwargs: {"score": 90.0, "verdict": "HIGH ELA RISK"}
+
+    analysis = fraud_scorer.analyze_invoice_image(Image.new("RGB", (64, 48), color=(240, 240, 240)))
+
+    assert analysis["ocr"]["verdict"] == "SKIPPED - OCR disabled"
+    assert analysis["ocr"]["score"] is None
+    # Only ELA (90 x 0.4) and metadata (50 x 0.3) count, renormalized over their 0.7 weight.
+    assert analysis["final_score"] == 72.86
+    assert analysis["verdict"].startswith("HIGH RISK")
+
+
+def test_final_verdict_accepts_numpy_scores() -> None:
+    """NumPy float scores must map to the same verdicts as Python floats, HIGH included."""
+
+    assert fraud_scorer_module._final_verdict_from_score(np.float64(70.0)).startswith("HIGH RISK")
+    assert fraud_scorer_module._final_verdict_from_score(np.float32(50.0)).startswith("MEDIUM RISK")
+    assert fraud_scorer_module._final_verdict_from_score(np.float64(10.0)).startswith("LOW RISK")
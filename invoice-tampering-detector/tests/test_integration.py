@@ -7,7 +7,11 @@ Place files here:
 
 from __future__ import annotations
 
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any
 
 import pytest
 
@@ -16,6 +20,8 @@ from detector.fraud_scorer import InvoiceFraudScorer
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".pdf"}
 
+_worker_fraud_scorer: InvoiceFraudScorer | None = None
+
 
 def _collect_sample_files(sample_directory: Path) -> list[Path]:
     """Collect sample invoice files by extension."""
@@ -23,17 +29,39 @@ def _collect_sample_files(sample_directory: Path) -> list[Path]:
     if not sample_directory.exists():
         return []
 
-    return sorted(
-        [
-            candidate
-            for candidate in sample_directory.iterdir()
-            if candidate.is_file() and candidate.suffix.lower() in ALLOWED_EXTENSIONS
+    # scandir's DirEntry answers is_file() from the directory listing on most platforms,
+    # so the filter needs no extra stat per entry and Paths are only built for matches.
+    with os.scandir(sample_directory) as directory_entries:
+        sample_files = [
+            Path(entry.path)
+            for entry in directory_entries
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in ALLOWED_EXTENSIONS
         ]
+    sample_files.sort()
+    return sample_files
+
+
+def _init_sample_worker(results_directory: str) -> None:
+    """Build one scorer per worker process (scorers hold locks and thread pools, so they don't pickle)."""
+
+    global _worker_fraud_scorer
+    _worker_fraud_scorer = InvoiceFraudScorer(
+        results_directory=results_directory,
+        public_results_prefix=None,
+        max_image_width_px=2000,
+        pdf_dpi=200,
     )
 
 
+def _analyze_sample(sample_path: Path) -> dict[str, Any]:
+    """Score one sample invoice in a worker process."""
+
+    assert _worker_fraud_scorer is not None
+    return _worker_fraud_scorer.analyze_invoice_file(str(sample_path))
+
+
 @pytest.mark.integration
-def test_detection_rate_exceeds_70_percent(tmp_path: Path) -> None:
+def test_detection_rate_exceeds_70_percent(tmp_path: Path, monkeypatch) -> None:
     """Verify the detector flags a strong majority of tampered invoices."""
 
     tests_root = Path(__file__).resolve().parent
@@ -46,28 +74,33 @@ def test_detection_rate_exceeds_70_percent(tmp_path: Path) -> None:
     assert len(legitimate_files) >= 5, f"Need 5+ legitimate samples in {legitimate_dir}"
     assert len(tampered_files) >= 5, f"Need 5+ tampered samples in {tampered_dir}"
 
-    fraud_scorer = InvoiceFraudScorer(
-        results_directory=str(tmp_path / "results"),
-        public_results_prefix=None,
-        max_image_width_px=2000,
-        pdf_dpi=200,
-    )
+    labeled_samples = [(path, "tampered") for path in tampered_files[:5]]
+    labeled_samples += [(path, "legitimate") for path in legitimate_files[:5]]
+    sample_paths = [sample_path for sample_path, _ in labeled_samples]
+
+    # Files are independent, so score them in parallel. Spawned workers inherit OMP_THREAD_LIMIT=1
+    # (set before they import Tesseract) so N workers x Tesseract threads don't oversubscribe.
+    # map() keeps input order for the CSV.
+    monkeypatch.setenv("OMP_THREAD_LIMIT", "1")
+    with ProcessPoolExecutor(
+        max_workers=min(len(sample_paths), os.cpu_count() or 1),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_sample_worker,
+        initargs=(str(tmp_path / "results"),),
+    ) as sample_executor:
+        analyses = list(sample_executor.map(_analyze_sample, sample_paths))
 
     true_positives = 0
     false_positives = 0
 
     print("\nfile,label,final_score,verdict")
-    for tampered_path in tampered_files[:5]:
-        analysis = fraud_scorer.analyze_invoice_file(str(tampered_path))
-        flagged = float(analysis["final_score"]) >= 40.0
-        true_positives += 1 if flagged else 0
-        print(f"{tampered_path.name},tampered,{analysis['final_score']},{analysis['verdict']}")
-
-    for legitimate_path in legitimate_files[:5]:
-        analysis = fraud_scorer.analyze_invoice_file(str(legitimate_path))
+    for (sample_path, label), analysis in zip(labeled_samples, analyses):
         flagged = float(analysis["final_score"]) >= 40.0
-        false_positives += 1 if flagged else 0
-        print(f"{legitimate_path.name},legitimate,{analysis['final_score']},{analysis['verdict']}")
+        if label == "tampered":
+            true_positives += 1 if flagged else 0
+        else:
+            false_positives += 1 if flagged else 0
+        print(f"{sample_path.name},{label},{analysis['final_score']},{analysis['verdict']}")
 
     detection_rate = true_positives / 5.0
     false_positive_rate = false_positives / 5.0
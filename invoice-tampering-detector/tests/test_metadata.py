@@ -2,19 +2,28 @@
 
 from __future__ import annotations
 
-from PIL import Image
+import io
+
+from PIL import ExifTags, Image
 
 from detector.metadata_checker import InvoiceMetadataInspector, _truncate_display_value
 
 
+class FakeExif(dict):
+    """Flat EXIF mapping that mimics Pillow's ``Image.Exif`` (no nested IFDs)."""
+
+    def get_ifd(self, tag):
+        return {}
+
+
 class FakeExifCarrier:
     """Small helper object that mimics Pillow's EXIF hook for controlled testing."""
 
     def __init__(self, exif_payload):
         self._exif_payload = exif_payload
 
-    def _getexif(self):  # noqa: SLF001 - intentional: matches Pillow's private EXIF method
-        return self._exif_payload
+    def getexif(self):
+        return FakeExif(self._exif_payload)
 
 
 def test_marks_no_exif_as_suspicious() -> None:
@@ -55,3 +64,19 @@ def test_truncates_metadata_values_to_100_chars() -> None:
     assert len(truncated) <= 100
 
 
+def test_reads_datetime_original_from_exif_sub_ifd() -> None:
+    """DateTimeOriginal is stored in the Exif sub-IFD and must still be compared to DateTime."""
+
+    exif = Image.Exif()
+    exif[306] = "2024:01:02 10:00:00"
+    exif[ExifTags.IFD.Exif] = {36867: "2024:01:01 10:00:00"}
+
+    invoice_jpeg = io.BytesIO()
+    Image.new("RGB", (16, 16), color=(255, 255, 255)).save(invoice_jpeg, format="JPEG", exif=exif)
+    invoice_jpeg.seek(0)
+
+    with Image.open(invoice_jpeg) as opened_image:
+        result = InvoiceMetadataInspector().inspect_invoice_image(opened_image)
+
+    assert result["metadata"]["DateTimeOriginal"] == "2024:01:01 10:00:00"
+    assert "datetime differs" in " ".join(result["flags"]).lower()
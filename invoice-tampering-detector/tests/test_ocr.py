@@ -0,0 +1,328 @@
+"""OCR validator unit tests (amount parsing, math checks, OCR text caching)."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from detector import _amount_kernels, ocr_validator
+from detector.ocr_validator import InvoiceOcrMathValidator
+
+
+# Run the amount checks through the NumPy path always, and through the Numba kernels when installed.
+_AMOUNT_KERNEL_MODES = [
+    False,
+    pytest.param(True, marks=pytest.mark.skipif(not _amount_kernels.NUMBA_AVAILABLE, reason="numba not installed")),
+]
+
+
+def _tesseract_tsv(text_lines: list[list[tuple[str, float]]]) -> str:
+    """Build header-less Tesseract TSV rows (a line row, then its words) from (word, confidence) lines."""
+
+    tsv_rows: list[str] = []
+    for line_index, line_words in enumerate(text_lines, start=1):
+        tsv_rows.append(f"4\t1\t1\t1\t{line_index}\t0\t0\t{line_index * 20}\t100\t16\t-1\t")
+        for word_index, (word_text, confidence) in enumerate(line_words, start=1):
+            tsv_rows.append(
+                f"5\t1\t1\t1\t{line_index}\t{word_index}\t{word_index * 30}\t{line_index * 20}"
+                f"\t28\t16\t{confidence}\t{word_text}"
+            )
+    return "\n".join(tsv_rows)
+
+
+def test_reuses_cached_ocr_text_for_identical_image_files(tmp_path: Path, monkeypatch) -> None:
+    """A second validation of the same file bytes should skip preprocessing and Tesseract."""
+
+    tesseract_calls: list[object] = []
+
+    def fake_tesseract(preprocessed_image, *, tesseract_config):
+        tesseract_calls.append(preprocessed_image)
+        return ocr_validator._tesseract_data_from_tsv(
+            _tesseract_tsv(
+                [[("Item", 95), ("$10.00", 91)], [("Item", 93), ("$20.00", 90)], [("Total", 96), ("$30.00", 92)]]
+            )
+        )
+
+    monkeypatch.setattr(ocr_validator, "_tesseract_is_available", lambda: {"available": True, "version": "test"})
+    monkeypatch.setattr(ocr_validator, "_extract_words_with_tesseract", fake_tesseract)
+
+    invoice_path = tmp_path / "invoice.png"
+    invoice_image = Image.new("RGB", (32, 32), color=(255, 255, 255))
+    invoice_image.paste((0, 0, 0), (4, 12, 28, 16))
+    invoice_image.save(invoice_path)
+
+    ocr_validator_instance = InvoiceOcrMathValidator(ocr_cache_directory=str(tmp_path / "cache"))
+    first_result = ocr_validator_instance.validate_image_path(str(invoice_path))
+    second_result = ocr_validator_instance.validate_image_path(str(invoice_path))
+
+    assert len(tesseract_calls) == 1
+    assert second_result == first_result
+    assert [amount["value"] for amount in second_result["amounts"]] == [10.0, 20.0, 30.0]
+    assert second_result["extracted_text"] == "Item $10.00\nItem $20.00\nTotal $30.00"
+
+
+def test_ocr_cache_misses_after_a_tesseract_upgrade(tmp_path: Path, monkeypatch) -> None:
+    """Cached words are keyed by engine and Tesseract version, so an upgrade re-runs OCR."""
+
+    tesseract_calls: list[object] = []
+
+    def fake_tesseract(preprocessed_image, *, tesseract_config):
+        tesseract_calls.append(preprocessed_image)
+        return ocr_validator._tesseract_data_from_tsv(_tesseract_tsv([[("Total", 96), ("$30.00", 92)]]))
+
+    monkeypatch.setattr(ocr_validator, "_extract_words_with_tesseract", fake_tesseract)
+
+    invoice_path = tmp_path / "invoice.png"
+    invoice_image = Image.new("RGB", (32, 32), color=(255, 255, 255))
+    invoice_image.paste((0, 0, 0), (4, 12, 28, 16))
+    invoice_image.save(invoice_path)
+
+    ocr_validator_instance = InvoiceOcrMathValidator(ocr_cache_directory=str(tmp_path / "cache"))
+    for tesseract_version in ("5.3.0", "5.3.0", "5.4.1"):
+        monkeypatch.setattr(
+            ocr_validator, "_tesseract_is_available", lambda: {"available": True, "version": tesseract_version}
+        )
+        ocr_validator_instance.validate_image_path(str(invoice_path))
+
+    assert len(tesseract_calls) == 2
+
+
+def test_ocr_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    """Pruning removes the oldest entries first until the cache fits its byte budget."""
+
+    cache_directory = tmp_path / "cache"
+    cache_directory.mkdir()
+    for entry_age, entry_name in enumerate(("newest", "middle", "oldest")):
+        entry_path = cache_directory / f"{entry_name}.json"
+        entry_path.write_text("x" * 100, encoding="utf-8")
+        os.utime(entry_path, (1_000_000 - entry_age, 1_000_000 - entry_age))
+
+    ocr_validator._prune_ocr_cache(str(cache_directory), max_cache_bytes=250)
+
+    assert sorted(path.name for path in cache_directory.iterdir()) == ["middle.json", "newest.json"]
+
+
+def test_low_confidence_words_stay_in_text_but_are_not_parsed_as_amounts() -> None:
+    """Amounts come from words at or above the confidence floor and keep their bbox and confidence."""
+
+    tesseract_data = ocr_validator._tesseract_data_from_tsv(
+        _tesseract_tsv([[("Subtotal", 90), ("$12.00", 88.5)], [("Tax", 91), ("$8.00", 31)]])
+    )
+    ocr_words = ocr_validator._ocr_words_from_tesseract_data(tesseract_data)
+
+    report = InvoiceOcrMathValidator(ocr_cache_directory=None).validate_ocr_words(ocr_words)
+
+    assert report["extracted_text"] == "Subtotal $12.00\nTax $8.00"
+    assert report["amounts"] == [{"raw": "$12.00", "value": 12.0, "bbox": [60, 20, 28, 16], "conf": 88.5}]
+
+
+def test_parses_amounts_with_thousands_separators_and_cents() -> None:
+    """Thousands groups are dropped; amounts need ".dd" and can't start or end inside a number."""
+
+    amount_bundle = ocr_validator._extract_amounts_from_text(
+        "Total $1,234.56 and 1.234.567,00 and 9.99 but not 12,50 or 1.2.34 or 12.345 "
+        "Subtotal.........45.00 Tax,8.00 Total.....$12.00"
+    )
+
+    assert [amount["raw"] for amount in amount_bundle["amounts"]] == ["$1,234.56", "9.99", "45.00", "8.00", "$12.00"]
+    assert amount_bundle["numeric_values"] == [1234.56, 9.99, 45.0, 8.0, 12.0]
+
+
+def test_flags_duplicate_amounts_once_in_sorted_order() -> None:
+    """Duplicates are reported once each, sorted, after rounding to cents."""
+
+    scoring_bundle = ocr_validator._score_amount_consistency_checks(
+        [5.0, 12.5, 5.001, 12.5, 40.0], tolerance_ratio=0.15
+    )
+
+    assert "Duplicate amounts detected: 5.00, 12.50" in scoring_bundle["flags"]
+
+
+@pytest.mark.parametrize("use_numba", _AMOUNT_KERNEL_MODES)
+def test_sum_mismatch_uses_the_largest_amount_as_total(monkeypatch, use_numba: bool) -> None:
+    """Line items are every amount except one copy of the max, compared within tolerance."""
+
+    monkeypatch.setattr(_amount_kernels, "NUMBA_AVAILABLE", use_numba)
+    assert not ocr_validator._sum_mismatch_with_tolerance([10.0, 20.0, 30.0], tolerance_ratio=0.15)
+    assert ocr_validator._sum_mismatch_with_tolerance([10.0, 5.0, 30.0], tolerance_ratio=0.15)
+    assert not ocr_validator._sum_mismatch_with_tolerance([10.0, 30.0], tolerance_ratio=0.15)
+
+
+def test_preprocessing_caps_the_longest_side_and_binarizes() -> None:
+    """Large scans are downscaled to the OCR cap and handed to Tesseract as 1-bit images."""
+
+    tall_scan = Image.new("RGB", (600, 3000), color=(255, 255, 255))
+
+    preprocessed = ocr_validator._preprocess_for_ocr(tall_scan, max_dimension_px=1000)
+
+    assert preprocessed.mode == "1"
+    assert preprocessed.size == (200, 1000)
+
+
+def test_reuses_one_tesserocr_api_and_falls_back_for_unsupported_configs(monkeypatch) -> None:
+    """The in-process engine is created once; configs beyond --psm go through pytesseract."""
+
+    created_apis: list[object] = []
+
+    class FakeTessBaseApi:
+        def __init__(self, *, lang):
+            created_apis.append(self)
+            self.page_seg_modes: list[int] = []
+
+        def SetPageSegMode(self, page_seg_mode):
+            self.page_seg_modes.append(page_seg_mode)
+
+        def SetImage(self, image):
+            self.image = image
+
+        def GetTSVText(self, page_number):
+            return _tesseract_tsv([[("Total", 95), ("$30.00", 93)]])
+
+    class FakeTesserocr:
+        PyTessBaseAPI = FakeTessBaseApi
+
+    pytesseract_configs: list[str] = []
+
+    def fake_pytesseract(preprocessed_image, *, tesseract_config):
+        pytesseract_configs.append(tesseract_config)
+        return {}
+
+    monkeypatch.setattr(ocr_validator, "tesserocr", FakeTesserocr)
+    monkeypatch.setattr(ocr_validator, "_extract_words_with_tesseract", fake_pytesseract)
+
+    ocr_validator_instance = InvoiceOcrMathValidator(ocr_cache_directory=None)
+    page = Image.new("1", (8, 8), color=1)
+    first_data = ocr_validator_instance._run_tesseract(page, tesseract_config="--psm 6")
+    second_data = ocr_validator_instance._run_tesseract(page, tesseract_config="--psm 4")
+    ocr_validator_instance._run_tesseract(page, tesseract_config="--psm 6 -c preserve_interword_spaces=1")
+
+    assert first_data == second_data
+    assert first_data["text"] == ["", "Total", "$30.00"]
+    assert len(created_apis) == 1
+    assert created_apis[0].page_seg_modes == [6, 4]
+    assert pytesseract_configs == ["--psm 6 -c preserve_interword_spaces=1"]
+
+
+@pytest.mark.parametrize("use_numba", _AMOUNT_KERNEL_MODES)
+def test_duplicate_scan_matches_between_small_and_large_inputs(monkeypatch, use_numba: bool) -> None:
+    """The Python path for short lists and the NumPy sorted-run path report the same duplicates."""
+
+    monkeypatch.setattr(_amount_kernels, "NUMBA_AVAILABLE", use_numba)
+    amount_array = np.array([40.0, 5.0, 12.5, 5.001, 12.5, 12.5, 7.25] * 4, dtype=np.float64)
+
+    assert ocr_validator._find_duplicate_amounts(amount_array[:7]) == [5.0, 12.5]
+    assert ocr_validator._find_duplicate_amounts(amount_array) == [5.0, 7.25, 12.5, 40.0]
+    assert ocr_validator._find_duplicate_amounts(amount_array, small_input_size=0) == [5.0, 7.25, 12.5, 40.0]
+
+
+def test_auto_denoise_only_blurs_speckled_scans() -> None:
+    """Clean thresholded scans skip the median blur; salt-and-pepper noise still gets removed."""
+
+    clean_pixels = np.full((200, 200), 255, dtype=np.uint8)
+    clean_pixels[40:60, 20:180] = 0
+    speckled_pixels = clean_pixels.copy()
+    speckled_pixels[100:200:7, 5:200:9] = 0
+
+    assert ocr_validator._isolated_pixel_fraction(clean_pixels) == 0.0
+    assert ocr_validator._isolated_pixel_fraction(speckled_pixels, row_step=1) > 0.001
+
+    speckled_image = Image.fromarray(speckled_pixels)
+    auto_result = np.asarray(ocr_validator._preprocess_for_ocr(speckled_image))
+    raw_result = np.asarray(ocr_validator._preprocess_for_ocr(speckled_image, denoise=False))
+
+    assert auto_result[100:200].all()
+    assert not raw_result[100:200].all()
+
+
+def test_preprocess_scratch_buffers_are_reused_for_smaller_pages() -> None:
+    """Scratch buffers grow once and are reused in place; returned images don't alias them."""
+
+    scratch = ocr_validator._PreprocessScratch()
+    large_page = Image.new("L", (300, 200), color=255)
+    small_page = Image.new("L", (100, 50), color=0)
+
+    first_image = ocr_validator._preprocess_for_ocr(large_page, denoise=True, scratch=scratch)
+    binary_buffer = scratch.binary
+    second_image = ocr_validator._preprocess_for_ocr(small_page, denoise=True, scratch=scratch)
+
+    assert scratch.binary is binary_buffer
+    assert binary_buffer.size == 300 * 200
+    assert np.asarray(first_image).all()
+    assert not np.asarray(second_image).any()
+
+
+def test_blank_pages_and_disabled_ocr_skip_tesseract(monkeypatch) -> None:
+    """Low-contrast pages (noisy blank scans too), or enabled=False, never reach Tesseract."""
+
+    def failing_tesseract(preprocessed_image, *, tesseract_config):
+        raise AssertionError("Tesseract should not run")
+
+    monkeypatch.setattr(ocr_validator, "_tesseract_is_available", lambda: {"available": True, "version": "test"})
+    monkeypatch.setattr(ocr_validator, "_extract_words_with_tesseract", failing_tesseract)
+
+    rng = np.random.default_rng(5)
+    blank_pages = [Image.new("L", (200, 200), color=250)]
+    for noise_sigma in (1.0, 2.5, 4.0):
+        noisy_pixels = np.clip(rng.normal(235.0, noise_sigma, (600, 450)), 0, 255).astype(np.uint8)
+        blank_pages.append(Image.fromarray(noisy_pixels))
+
+    sparse_text_pixels = np.clip(rng.normal(235.0, 3.0, (600, 450)), 0, 255).astype(np.uint8)
+    sparse_text_pixels[100:106, 40:160] = 30  # one short line of "text", about 0.3% of the page
+
+    ocr_validator_instance = InvoiceOcrMathValidator(ocr_cache_directory=None)
+    blank_reports = [ocr_validator_instance.validate_invoice_image(page) for page in blank_pages]
+    sparse_text_report = ocr_validator_instance.validate_invoice_image(Image.fromarray(sparse_text_pixels))
+    skipped_report = ocr_validator_instance.validate_invoice_image(Image.new("L", (200, 200)), enabled=False)
+
+    assert [report["verdict"] for report in blank_reports] == ["INCONCLUSIVE - No text detected"] * 4
+    assert sparse_text_report["verdict"] == "INCONCLUSIVE - OCR extraction failed"  # reached Tesseract
+    assert skipped_report["verdict"] == "SKIPPED - OCR disabled"
+    assert blank_reports[0]["score"] == 40.0
+    assert skipped_report["score"] is None
+
+
+@pytest.mark.parametrize("use_numba", _AMOUNT_KERNEL_MODES)
+def test_numba_amount_kernels_match_numpy_checks(monkeypatch, use_numba: bool) -> None:
+    """The amount kernels, compiled or uncompiled fallback, must agree with the NumPy reference paths."""
+
+    monkeypatch.setattr(_amount_kernels, "NUMBA_AVAILABLE", use_numba)
+
+    rng = np.random.default_rng(11)
+    amount_array = np.round(rng.uniform(0.0, 50.0, 60), 1)
+
+    expected_rounded = np.round(amount_array, 2)
+    unique_values, value_counts = np.unique(expected_rounded, return_counts=True)
+    assert _amount_kernels.sorted_duplicates(amount_array) == unique_values[value_counts > 1].tolist()
+
+    for amount_values in ([10.0, 20.0, 30.0], [10.0, 5.0, 30.0], [10.0, 30.0], [-5.0, -1.0, -2.0]):
+        amount_values = np.asarray(amount_values)
+        line_items_sum = amount_values.sum() - amount_values.max()
+        expected = amount_values.size >= 3 and amount_values.max() > 0 and (
+            abs(line_items_sum - amount_values.max()) / amount_values.max() > 0.15
+        )
+        assert _amount_kernels.sum_mismatch(amount_values, 0.15) == expected
+
+
+def test_extracted_text_display_is_truncated_after_dropping_nul_bytes() -> None:
+    """The 500-character display excerpt never contains NULs and stays full-length when text allows."""
+
+    ocr_validator_instance = InvoiceOcrMathValidator(ocr_cache_directory=None)
+    long_text = "Total $30.00 " * 100
+
+    plain_report = ocr_validator_instance.validate_extracted_text(long_text)
+    nul_report = ocr_validator_instance.validate_extracted_text("\x00" * 40 + long_text)
+
+    assert plain_report["extracted_text"] == long_text[:500]
+    assert nul_report["extracted_text"] == long_text[:500]
+
+
+def test_text_without_a_decimal_point_has_no_amounts() -> None:
+    """Amounts need ".dd", so dot-free text short-circuits to an empty result."""
+
+    amount_bundle = ocr_validator._extract_amounts_from_text("Invoice 1042, qty 3, 12,50")
+
+    assert amount_bundle == {"amounts": [], "numeric_values": []}